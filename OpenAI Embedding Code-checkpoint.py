@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 from typing import Optional, List
+import argparse
 import asyncio
+import json
+import os
+import tiktoken
 import streamlit as st
 import openai
 from openai import AsyncOpenAI
 from pinecone import Pinecone
 from transformers import pipeline
+from chunking import chunk_text
+from index_manifest import IndexManifest
+from ingestion import ingest, load_failure_report
+from response_cache import mark_index_updated
+from vector_store import FanOutVectorStore, LocalVectorStore, PineconeVectorStore
 
 # Grab secrets from st.secrets
 OPENAI_API_KEY = st.secrets["openai_api_key"]
 PINECONE_API_KEY = st.secrets["pinecone_api_key"]
+PINECONE_ENV = st.secrets.get("pinecone_env")
 
 if not OPENAI_API_KEY:
     raise ValueError("❌ Missing OPENAI_API_KEY in st.secrets.")
@@ -22,10 +32,23 @@ openai.api_key = OPENAI_API_KEY
 client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 pc = Pinecone(api_key=PINECONE_API_KEY, environment=PINECONE_ENV)
 index = pc.Index("ai-powered-chatbot")
+vector_store = PineconeVectorStore(index)
 
 # Paths
 MERGED_JSON_PATH = "/mnt/c/Users/osato/openai_setup/merged_knowledge_base.json"
-EMBEDDINGS_OUTPUT_PATH = "/mnt/c/Users/osato/openai_setup/knowledgebase_embeddings.json"
+# Binary artifact (knowledgebase_embeddings.npy + .json sidecar, see embedding_artifact.py)
+EMBEDDINGS_OUTPUT_PATH = "/mnt/c/Users/osato/openai_setup/knowledgebase_embeddings.npy"
+ARTIFACT_DTYPE = "float32"  # "float16" halves the file at a small precision cost
+# Hash of every embedded QA text, so re-runs only embed what changed
+MANIFEST_PATH = "/mnt/c/Users/osato/openai_setup/embedding_manifest.json"
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# Chunks that still failed after retries; `--resume` re-runs just these
+FAILURE_REPORT_PATH = "/mnt/c/Users/osato/openai_setup/embedding_failures.jsonl"
+
+# Ingestion limits: keep these at (or just under) the OpenAI account's rate limits
+CONCURRENCY = 8
+REQUESTS_PER_MINUTE = 3000
+TOKENS_PER_MINUTE = 1_000_000
 
 # --------------------------------------------------------------------------
 # 2. LOAD MERGED KNOWLEDGE BASE
@@ -47,120 +70,193 @@ if num_qas == 0:
 # --------------------------------------------------------------------------
 # 3. TOKENIZER & CHUNKING UTILS
 # --------------------------------------------------------------------------
-tokenizer = tiktoken.encoding_for_model("text-embedding-ada-002")
+tokenizer = tiktoken.encoding_for_model(EMBEDDING_MODEL)
 
 def count_tokens(text: str) -> int:
     """Count tokens for text using the text-embedding-ada-002 tokenizer."""
     return len(tokenizer.encode(text))
 
-def split_text_by_tokens(text: str, max_tokens: int = 512) -> list[str]:
-    """Naive word-split approach ensuring <= max_tokens in each chunk."""
-    words = text.split()
-    chunks = []
-    current_words = []
-
-    for word in words:
-        current_words.append(word)
-        if count_tokens(" ".join(current_words)) > max_tokens:
-            # finalize current chunk
-            current_words.pop()
-            chunk_str = " ".join(current_words).strip()
-            if chunk_str:
-                chunks.append(chunk_str)
-            current_words = [word]
-
-    # leftover words
-    if current_words:
-        leftover_str = " ".join(current_words).strip()
-        if leftover_str:
-            chunks.append(leftover_str)
-
-    return chunks
+# Chunks longer documents are split into, and the tokens neighbouring chunks share
+CHUNK_MAX_TOKENS = 512
+CHUNK_OVERLAP = 64
+
+def split_text_by_tokens(text: str, max_tokens: int = CHUNK_MAX_TOKENS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """Split text into <= max_tokens chunks on paragraph/sentence boundaries (encodes once)."""
+    return [chunk for chunk, _ in chunk_text(text, tokenizer, max_tokens, overlap=overlap)]
 
 # --------------------------------------------------------------------------
 # 4. EMBEDDING LOGIC (UPDATING PINECONE CORRECTLY)
 # --------------------------------------------------------------------------
-def embed_qa_pairs(pairs):
+def build_qa_document(idx, qa):
+    """Return (doc_id, full_text, metadata) for one QA pair, or None if it has no content."""
+    doc_id = qa.get("id", f"qa_{idx}")
+    category = qa.get("category_id", "unknown")
+    source = qa.get("source", "unknown")  # "existing" or "extracted"
+    is_emergency = qa.get("is_emergency", False)
+    question = (qa.get("question") or "").strip()
+
+    # Ensure answer is a structured dictionary
+    ans_block = qa.get("answer", {})
+    if not isinstance(ans_block, dict):
+        ans_block = {
+            "main_points": [str(ans_block).strip()],
+            "examples": [],
+            "tips": [],
+            "related_topics": []
+        }
+
+    # Combine answer fields into a single string
+    main_points = " ".join(ans_block.get("main_points", [])).strip()
+    examples = " ".join(ans_block.get("examples", []))
+    tips = " ".join(ans_block.get("tips", []))
+    rel_topics = " ".join(ans_block.get("related_topics", []))
+    combined_answer = f"{main_points}\n{examples}\n{tips}\n{rel_topics}".strip()
+
+    if not question or not combined_answer:
+        print(f"⚠️ Skipping doc_id='{doc_id}' due to empty question or answer.")
+        return None
+
+    # "question" and "answer" are what retrieval puts in the prompt, as in re-indexing.py
+    metadata = {
+        "doc_id": doc_id,
+        "question": question,
+        "answer": main_points,
+        "category": category,
+        "source": source,
+        "is_emergency": is_emergency,
+    }
+    return doc_id, f"Q: {question}\nA: {combined_answer}", metadata
+
+
+def manifest_text(full_text, metadata):
+    """What the manifest hashes for a document: its text plus its metadata, so a metadata change re-upserts it."""
+    return f"{full_text}\n{json.dumps(metadata, sort_keys=True, ensure_ascii=False)}"
+
+
+async def embed_qa_pairs(pairs, store=vector_store, manifest=None, resume=False, concurrency=CONCURRENCY,
+                         requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE):
     """
     For each QA pair:
       - Embed the text.
       - Ensure answers are structured properly.
-      - Store metadata in Pinecone.
+      - Store metadata in Pinecone (or whatever `store` is).
+    With a manifest, only new or changed QA pairs are embedded, chunks of
+    removed pairs are deleted, and unchanged pairs are skipped.
+    Embedding and upserts run concurrently through ingestion.ingest(); with
+    resume=True only the chunks in the last failure report are retried.
+    Returns (vectors upserted, vectors deleted).
     """
-    total = len(pairs)
-    print(f"🔵 Embedding {total} QA pairs...")
-
-    for idx, qa in enumerate(pairs):
-        doc_id = qa.get("id", f"qa_{idx}")
-        category = qa.get("category_id", "unknown")
-        source = qa.get("source", "unknown")  # "existing" or "extracted"
-        is_emergency = qa.get("is_emergency", False)
-        question = (qa.get("question") or "").strip()
-
-        # Ensure answer is a structured dictionary
-        ans_block = qa.get("answer", {})
-        if not isinstance(ans_block, dict):
-            ans_block = {
-                "main_points": [str(ans_block).strip()],
-                "examples": [],
-                "tips": [],
-                "related_topics": []
-            }
-
-        # Combine answer fields into a single string
-        main_points = " ".join(ans_block.get("main_points", []))
-        examples = " ".join(ans_block.get("examples", []))
-        tips = " ".join(ans_block.get("tips", []))
-        rel_topics = " ".join(ans_block.get("related_topics", []))
-        combined_answer = f"{main_points}\n{examples}\n{tips}\n{rel_topics}".strip()
-
-        if not question or not combined_answer:
-            print(f"⚠️ Skipping doc_id='{doc_id}' due to empty question or answer.")
-            continue
+    documents = [doc for doc in (build_qa_document(idx, qa) for idx, qa in enumerate(pairs)) if doc]
+
+    deleted = 0
+    if manifest is not None and not resume:
+        changed, removed = manifest.plan({
+            doc_id: manifest_text(full_text, metadata) for doc_id, full_text, metadata in documents
+        })
+        stale_ids = [chunk_id for doc_id in removed for chunk_id in manifest.vector_ids(doc_id)]
+        if stale_ids:
+            store.delete(stale_ids)
+            deleted += len(stale_ids)
+        for doc_id in removed:
+            manifest.forget(doc_id)
 
-        full_text = f"Q: {question}\nA: {combined_answer}"
-        full_len = count_tokens(full_text)
+        changed = set(changed)
+        unchanged = len(documents) - len(changed)
+        documents = [doc for doc in documents if doc[0] in changed]
+        print(f"🔍 {len(documents)} new or changed, {len(removed)} removed, {unchanged} unchanged.")
+
+    items = []
+    doc_chunks = {}  # doc_id -> (manifest text, chunk ids)
+    for doc_id, full_text, metadata in documents:
+        # Encode once; the chunker reuses these tokens instead of re-encoding
+        tokens = tokenizer.encode(full_text)
 
         # If the text is too long, split it into chunks
-        if full_len > 8192:
-            text_chunks = split_text_by_tokens(full_text, max_tokens=512)
+        if len(tokens) > 8192:
+            text_chunks = chunk_text(full_text, tokenizer, CHUNK_MAX_TOKENS, overlap=CHUNK_OVERLAP, tokens=tokens)
         else:
-            text_chunks = [full_text]
-
-        print(f"   • {idx+1}/{total} => doc_id='{doc_id}', {len(text_chunks)} chunk(s), tokens={full_len}")
-
-        for c_idx, chunk_str in enumerate(text_chunks):
-            try:
-                # Generate embedding
-                resp = client.embeddings.create(
-                    model="text-embedding-ada-002",
-                    input=chunk_str
-                )
-                vector = resp.data[0].embedding
-
-                chunk_id = f"{doc_id}_chunk{c_idx}"
-                index.upsert([
-                    {
-                        "id": chunk_id,
-                        "values": vector,
-                        "metadata": {
-                            "doc_id": doc_id,
-                            "category": category,
-                            "source": source,
-                            "is_emergency": is_emergency,
-                            "text_chunk": chunk_str
-                        }
-                    }
-                ])
-
-                time.sleep(0.2)  # Avoid rate limits
-
-            except Exception as e:
-                print(f"❌ Error embedding doc_id={doc_id}, chunk={c_idx}: {e}")
+            text_chunks = [(full_text, len(tokens))]
+
+        chunk_ids = [f"{doc_id}_chunk{c_idx}" for c_idx in range(len(text_chunks))]
+        doc_chunks[doc_id] = (manifest_text(full_text, metadata), chunk_ids)
+        items.extend(
+            {"id": chunk_id, "text": chunk_str, "tokens": n_tokens, "metadata": metadata}
+            for chunk_id, (chunk_str, n_tokens) in zip(chunk_ids, text_chunks)
+        )
+
+    if resume:
+        items = load_failure_report(FAILURE_REPORT_PATH)
+        print(f"🔁 Resuming {len(items)} failed chunk(s) from: {FAILURE_REPORT_PATH}")
+
+    print(f"🔵 Embedding {len(items)} chunk(s)...")
+    done_ids = await ingest(
+        items, client, store,
+        model=EMBEDDING_MODEL,
+        count_tokens=count_tokens,
+        concurrency=concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        failure_report_path=FAILURE_REPORT_PATH
+    )
+
+    if manifest is None:
+        return len(done_ids), deleted
+
+    # A document is done once none of its chunks is still failing; a failed one is retried next run
+    attempted = {item["id"] for item in items}
+    for doc_id, (text, chunk_ids) in doc_chunks.items():
+        if not any(chunk_id in attempted for chunk_id in chunk_ids):
+            continue
+        if all(chunk_id in done_ids or chunk_id not in attempted for chunk_id in chunk_ids):
+            stale_ids = [chunk_id for chunk_id in manifest.vector_ids(doc_id) if chunk_id not in chunk_ids]
+            if stale_ids:
+                store.delete(stale_ids)
+                deleted += len(stale_ids)
+            manifest.record(doc_id, text, chunk_ids)
+    return len(done_ids), deleted
 
 # --------------------------------------------------------------------------
 # 5. MAIN - EMBED & SAVE
 # --------------------------------------------------------------------------
 if __name__ == "__main__":
-    embed_qa_pairs(qa_pairs)
-    print("✅ Embedding process completed.")
+    parser = argparse.ArgumentParser(description="Embed the merged knowledge base into Pinecone.")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"only retry the chunks listed in {FAILURE_REPORT_PATH}")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help=f"embedding requests in flight (default: {CONCURRENCY})")
+    parser.add_argument("--rpm", type=int, default=REQUESTS_PER_MINUTE,
+                        help=f"requests-per-minute budget (default: {REQUESTS_PER_MINUTE})")
+    parser.add_argument("--tpm", type=int, default=TOKENS_PER_MINUTE,
+                        help=f"tokens-per-minute budget (default: {TOKENS_PER_MINUTE})")
+    args = parser.parse_args()
+
+    manifest = IndexManifest(MANIFEST_PATH, EMBEDDING_MODEL)
+
+    # Every vector also goes into the local binary artifact used by offline retrieval
+    if os.path.isfile(EMBEDDINGS_OUTPUT_PATH):
+        local_store = LocalVectorStore.load(EMBEDDINGS_OUTPUT_PATH)
+        local_store.dtype = ARTIFACT_DTYPE
+    else:
+        local_store = LocalVectorStore(dtype=ARTIFACT_DTYPE)
+        if manifest.entries:
+            print("⚠️ No local embedding artifact yet; re-embedding everything to build it.")
+            manifest.clear()
+
+    try:
+        upserted, deleted = asyncio.run(embed_qa_pairs(
+            qa_pairs,
+            store=FanOutVectorStore(vector_store, local_store),
+            manifest=manifest,
+            resume=args.resume,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm
+        ))
+    finally:
+        local_store.save(EMBEDDINGS_OUTPUT_PATH, model=EMBEDDING_MODEL)
+        manifest.save()
+
+    if upserted or deleted:
+        # Cached chatbot answers were generated from the old index
+        mark_index_updated(qa_pairs_count=num_qas, embedded=upserted, removed=deleted)
+    print(f"✅ Embedding process completed. Local artifact: {EMBEDDINGS_OUTPUT_PATH}")
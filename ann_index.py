@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Approximate nearest-neighbour index for the local vector store.
+#
+# Once every university PDF is ingested we go from a few hundred chunks to hundreds
+# of thousands, and a brute-force matmul over all of them stops being cheap. IVFIndex
+# is an inverted-file index:
+#   - k-means splits the (unit-normalized) vectors into n_lists clusters
+#   - each cluster keeps its members in one contiguous float32 block
+#   - a query scores the centroids, then only the n_probe closest clusters
+#
+# Knobs:
+#   n_lists  more lists = smaller lists = faster queries, but more centroids to score
+#   n_probe  lists searched per query; raise it for recall, lower it for latency
+#
+# Vectors are added incrementally (each goes to its nearest centroid) and the whole
+# index round-trips through save()/load(). Labels are integers chosen by the caller;
+# LocalVectorStore uses its row numbers.
+
+import numpy as np
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def train_centroids(vectors, n_lists, n_iter=10, sample_size=20000, seed=0):
+    """Spherical k-means on a sample of `vectors`, returning (n_lists, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    n_lists = min(n_lists, len(vectors))
+
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=n_lists)
+        empty = counts == 0
+        # Re-seed empty clusters with random points so every list stays useful
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Inverted-file ANN index over cosine similarity."""
+
+    def __init__(self, centroids, n_probe=8):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.n_probe = n_probe
+        n_lists, dim = self.centroids.shape
+        self._vectors = [np.empty((0, dim), dtype=np.float32) for _ in range(n_lists)]
+        self._labels = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self._sizes = [0] * n_lists
+        self._where = {}  # label -> (list number, position in list)
+
+    @classmethod
+    def build(cls, vectors, labels=None, n_lists=None, n_probe=8, n_iter=10):
+        """Train centroids on `vectors` and add them all; n_lists defaults to ~4*sqrt(N)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if n_lists is None:
+            n_lists = max(1, int(4 * np.sqrt(len(vectors))))
+        index = cls(train_centroids(vectors, n_lists, n_iter=n_iter), n_probe=n_probe)
+        index.add(vectors, np.arange(len(vectors)) if labels is None else labels)
+        return index
+
+    def __len__(self):
+        return len(self._where)
+
+    def add(self, vectors, labels):
+        """Insert (or move) `vectors` under integer `labels`, each into its nearest list."""
+        vectors = _normalize(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        labels = np.atleast_1d(np.asarray(labels, dtype=np.int64))
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for vector, label, list_no in zip(vectors, labels, assignment):
+            label = int(label)
+            if label in self._where:
+                self.remove(label)
+            self._append(int(list_no), vector, label)
+
+    def _append(self, list_no, vector, label):
+        size = self._sizes[list_no]
+        if size == len(self._labels[list_no]):
+            capacity = max(16, size * 2)
+            grown = np.empty((capacity, self.centroids.shape[1]), dtype=np.float32)
+            grown[:size] = self._vectors[list_no][:size]
+            grown_labels = np.empty(capacity, dtype=np.int64)
+            grown_labels[:size] = self._labels[list_no][:size]
+            self._vectors[list_no] = grown
+            self._labels[list_no] = grown_labels
+        self._vectors[list_no][size] = vector
+        self._labels[list_no][size] = label
+        self._sizes[list_no] = size + 1
+        self._where[label] = (list_no, size)
+
+    def remove(self, label):
+        """Drop `label` from the index (no-op if unknown)."""
+        location = self._where.pop(int(label), None)
+        if location is None:
+            return
+        list_no, pos = location
+        last = self._sizes[list_no] - 1
+        if pos != last:
+            moved = int(self._labels[list_no][last])
+            self._vectors[list_no][pos] = self._vectors[list_no][last]
+            self._labels[list_no][pos] = moved
+            self._where[moved] = (list_no, pos)
+        self._sizes[list_no] = last
+
+    def relabel(self, old_label, new_label):
+        """Rename a stored vector's label (used when the owning store compacts its rows)."""
+        location = self._where.pop(int(old_label), None)
+        if location is None:
+            return
+        list_no, pos = location
+        self._labels[list_no][pos] = new_label
+        self._where[int(new_label)] = location
+
+    def search(self, query, top_k=3, n_probe=None):
+        """Return (labels, scores) of the approximate top_k, best first."""
+        query = _normalize(np.asarray(query, dtype=np.float32))
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        candidate_labels = []
+        candidate_scores = []
+        for list_no in probe:
+            size = self._sizes[list_no]
+            if size:
+                candidate_scores.append(self._vectors[list_no][:size] @ query)
+                candidate_labels.append(self._labels[list_no][:size])
+        if not candidate_scores:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.concatenate(candidate_scores)
+        labels = np.concatenate(candidate_labels)
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return labels[top], scores[top]
+
+    def save(self, path):
+        """Write centroids and lists to one .npz file."""
+        offsets = np.cumsum([0] + self._sizes)
+        dim = self.centroids.shape[1]
+        np.savez(
+            path,
+            centroids=self.centroids,
+            n_probe=np.array(self.n_probe),
+            offsets=offsets,
+            vectors=np.concatenate([v[:n] for v, n in zip(self._vectors, self._sizes)])
+            if len(self) else np.empty((0, dim), dtype=np.float32),
+            labels=np.concatenate([l[:n] for l, n in zip(self._labels, self._sizes)])
+            if len(self) else np.empty(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()."""
+        with np.load(path) as data:
+            index = cls(data["centroids"], n_probe=int(data["n_probe"]))
+            offsets = data["offsets"]
+            vectors = data["vectors"]
+            labels = data["labels"]
+        for list_no in range(len(index.centroids)):
+            start, end = offsets[list_no], offsets[list_no + 1]
+            index._vectors[list_no] = np.array(vectors[start:end], dtype=np.float32)
+            index._labels[list_no] = np.array(labels[start:end], dtype=np.int64)
+            index._sizes[list_no] = int(end - start)
+            for pos, label in enumerate(index._labels[list_no]):
+                index._where[int(label)] = (list_no, pos)
+        return index
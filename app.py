@@ -2,102 +2,168 @@
 # coding: utf-8
 
 import streamlit as st
-import openai
-from openai import AsyncOpenAI
-from pinecone import Pinecone  # Import the Pinecone class
-from transformers import pipeline
 import asyncio  # Ensure asyncio is imported
+from crisis_detector import detect_crisis
+from resources import (
+    EMBEDDING_TIMEOUT,
+    RETRIEVAL_CANDIDATES,
+    RETRIEVAL_MODE,
+    SENTIMENT_MODE,
+    WARM_UP_ON_START,
+    get_bm25_index,
+    get_direct_answer_matcher,
+    get_embedding_cache,
+    get_embedding_dispatcher,
+    get_emergency_response,
+    get_intent_router,
+    get_openai_client,
+    get_response_cache,
+    get_sentiment_batcher,
+    get_vector_store,
+    iterate_async,
+    warm_up,
+)
 
 # Debug print to verify asyncio is imported
 print("DEBUG: asyncio module is", asyncio)
 
-# Access API keys securely
-OPENAI_API_KEY = st.secrets["openai_api_key"]
-PINECONE_API_KEY = st.secrets["pinecone_api_key"]
+# Clients and the sentiment model are built once per process (see resources.py),
+# so a Streamlit rerun no longer reloads them on every chat message.
+
+# Greetings, farewells and small talk get a canned reply when they make up the
+# whole message (see intent_router.py and intents.json)
+def detect_generic_intent(query):
+    return get_intent_router().route(query)
+
+# Function to Detect Sentiment: concurrent calls from all sessions share batched forward passes
+async def detect_sentiment(query):
+    return await get_sentiment_batcher().submit(query)
 
-# Check if API keys are loaded correctly
-if not OPENAI_API_KEY:
-    raise ValueError("❌ OPENAI_API_KEY not found! Check your Streamlit secrets.")
-if not PINECONE_API_KEY:
-    raise ValueError("❌ PINECONE_API_KEY not found! Check your Streamlit secrets.")
+# With UNIEASE_SENTIMENT_MODE=after (opt-in, for watching the mood of traffic in the
+# logs), sentiment is logged once the answer has been sent, on the background loop,
+# so it never delays a response
+_background_tasks = set()
 
-# Initialize OpenAI & Pinecone
-openai.api_key = OPENAI_API_KEY
-aclient = AsyncOpenAI(api_key=OPENAI_API_KEY)
+def record_sentiment(query, sentiment):
+    print(f"📊 Sentiment: {sentiment} ({len(query)} chars)")
 
-# Create an instance of the Pinecone class and connect to your index
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index("ai-powered-chatbot")
+async def _sentiment_after(query):
+    try:
+        record_sentiment(query, await detect_sentiment(query))
+    except Exception as e:
+        print(f"⚠️ Background sentiment failed: {e}")
 
-print("✅ API keys loaded successfully!")
-print("✅ Pinecone and OpenAI clients initialized!")
+def schedule_sentiment_after(query):
+    task = asyncio.get_running_loop().create_task(_sentiment_after(query))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
-# Load Sentiment Analysis Model
-sentiment_analyzer = pipeline(
-    "sentiment-analysis",
-    model="distilbert/distilbert-base-uncased-finetuned-sst-2-english",
-    revision="714eb0f"
+NEGATIVE_TONE_INSTRUCTION = (
+    " The student seems stressed or upset: acknowledge how they feel and be especially warm and reassuring."
 )
 
-# Generic Intent Responses
-GENERIC_INTENTS = {
-    "hello": "Hello! How can I assist you today?",
-    "hi": "Hi! How can I help you?",
-    "how are you": "I'm just a chatbot, but I'm here to help you! What can I do for you?",
-    "bye": "Goodbye! Have a great day!",
-    "exit": "Goodbye! Have a great day!",
-    "quit": "Goodbye! Have a great day!",
-}
+# Embed the query; repeated questions are answered from the embedding cache without a round-trip,
+# and new ones are batched with other sessions' queries into one embeddings request.
+# Returns None if embedding fails or takes longer than UNIEASE_EMBEDDING_TIMEOUT.
+async def embed_query(query):
+    try:
+        return await asyncio.wait_for(
+            get_embedding_cache().get_or_embed(query, get_openai_client(), dispatcher=get_embedding_dispatcher()),
+            EMBEDDING_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        print(f"⚠️ Embedding took longer than {EMBEDDING_TIMEOUT}s; using keyword retrieval")
+        return None
+    except Exception as e:
+        print(f"❌ Error embedding query: {e}")
+        return None
+
+# Retrieve Relevant Chunks: vector store (Pinecone or local) and BM25 keyword results,
+# fused by reciprocal rank (UNIEASE_RETRIEVAL picks hybrid, vector or bm25, see resources.py).
+# Without a query embedding, hybrid retrieval answers from BM25 alone.
+async def retrieve_chunks(query, top_k=3, query_embedding=None, embed_missing=True):
+    from bm25_index import fuse_matches
 
-def detect_generic_intent(query):
-    query = query.lower().strip()
-    for intent, response in GENERIC_INTENTS.items():
-        if intent in query:
-            return response
-    return None
-
-# Function to Detect Sentiment
-def detect_sentiment(query):
-    result = sentiment_analyzer(query)[0]
-    return result['label'].lower()
-
-# Retrieve Relevant Chunks from Pinecone
-async def retrieve_chunks(query, top_k=3):
     try:
         if not query or not isinstance(query, str):
             return []
 
-        response = await aclient.embeddings.create(
-            model="text-embedding-ada-002",
-            input=[query.strip()]
-        )
-        query_embedding = response.data[0].embedding
-
-        result = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-        return [match.metadata.get("answer", "") for match in result.matches]
+        match_lists = []
+        if RETRIEVAL_MODE != "bm25":
+            if query_embedding is None and embed_missing:
+                query_embedding = await embed_query(query)
+            if query_embedding is not None:
+                try:
+                    match_lists.append(get_vector_store().query(query_embedding, top_k=RETRIEVAL_CANDIDATES))
+                except Exception as e:
+                    print(f"❌ Error querying vector store: {e}")
+        if RETRIEVAL_MODE != "vector":
+            match_lists.append(get_bm25_index().query(query, top_k=RETRIEVAL_CANDIDATES))
+
+        return [match.metadata.get("answer", "") for match in fuse_matches(match_lists, top_k=top_k)]
     except Exception as e:
-        st.error(f"❌ Error retrieving chunks: {e}")
+        # Runs on the background event loop, where st.error has no page to draw on
+        print(f"❌ Error retrieving chunks: {e}")
         return []
 
-# Generate Response
-async def generate_response(query):
+# Stream Response: yields the answer piece by piece as tokens arrive
+async def stream_response(query):
+    # Crisis language gets the emergency resources at once: no sentiment, retrieval or LLM
+    if detect_crisis(query):
+        yield get_emergency_response()
+        return
+
     generic_response = detect_generic_intent(query)
     if generic_response:
-        return generic_response
+        yield generic_response
+        return
 
-    sentiment_task = asyncio.to_thread(detect_sentiment, query)
-    retrieval_task = retrieve_chunks(query)
-
-    sentiment, retrieved_chunks = await asyncio.gather(sentiment_task, retrieval_task)
+    try:
+        async for piece in answer_from_knowledge_base(query):
+            yield piece
+    finally:
+        if SENTIMENT_MODE == "after":
+            schedule_sentiment_after(query)
+
+# Retrieval-augmented answer: cache lookup, retrieval, then the streamed GPT reply
+async def answer_from_knowledge_base(query):
+    # A question the knowledge base already holds (near) verbatim gets its stored answer, with no LLM call
+    direct_answer = get_direct_answer_matcher().answer(query)
+    if direct_answer:
+        yield direct_answer
+        return
+
+    query_embedding = await embed_query(query) if RETRIEVAL_MODE != "bm25" else None
+
+    # Near-duplicates of an earlier question get the earlier answer, with no LLM call
+    response_cache = get_response_cache()
+    if query_embedding is not None:
+        cached_answer = response_cache.lookup(query_embedding)
+        if cached_answer:
+            yield cached_answer
+            return
+
+    # Sentiment only runs on the hot path when the prompt uses it (UNIEASE_SENTIMENT_MODE=inline).
+    # It starts after the cache lookup, so a cached answer never pays for it, and runs alongside retrieval
+    sentiment_task = None
+    if SENTIMENT_MODE == "inline":
+        sentiment_task = asyncio.create_task(detect_sentiment(query))
+
+    retrieved_chunks = await retrieve_chunks(query, query_embedding=query_embedding, embed_missing=False)
+    # Sentiment only adjusts the tone; if it fails the answer goes ahead without it
+    sentiment = None
+    if sentiment_task:
+        try:
+            sentiment = await sentiment_task
+        except Exception as e:
+            print(f"⚠️ Inline sentiment failed: {e}")
 
     if not retrieved_chunks:
-        return "Unfortunately, I couldn't find relevant information. Please try rephrasing your question."
+        yield "Unfortunately, I couldn't find relevant information. Please try rephrasing your question."
+        return
 
     context = "\n".join(retrieved_chunks)
+    tone_adjusted = sentiment == "negative"
     prompt = f"""
     You are a university support chatbot. Answer user queries using the provided relevant information. 
     Only use the retrieved information and do not add extra knowledge unless necessary.
@@ -111,9 +177,8 @@ async def generate_response(query):
     """
 
     try:
-        response_text = ""
         # Using GPT-3.5-turbo as an example
-        gpt_response = await aclient.chat.completions.create(
+        gpt_response = await get_openai_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content":
@@ -121,6 +186,7 @@ async def generate_response(query):
                     "Expand on key points, avoid generic responses, and ensure clarity. "
                     "If discussing study techniques, provide examples or step-by-step guidance. "
                     "Use full sentences rather than short bullet points unless specifically requested."
+                    + (NEGATIVE_TONE_INSTRUCTION if tone_adjusted else "")
                 },
                 {"role": "user", "content": prompt}
             ],
@@ -129,14 +195,22 @@ async def generate_response(query):
             stream=True
         )
 
+        answer_parts = []
         async for chunk in gpt_response:
             if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                response_text += chunk.choices[0].delta.content
+                answer_parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
 
-        return response_text
+        # An answer written for a student who seems stressed is not reused for anyone else
+        if query_embedding is not None and not tone_adjusted:
+            response_cache.store(query_embedding, "".join(answer_parts), question=query)
 
     except Exception as e:
-        return f"❌ Error: {e}"
+        yield f"❌ Error: {e}"
+
+# Generate Response: the full answer as one string, for callers that don't stream
+async def generate_response(query):
+    return "".join([piece async for piece in stream_response(query)])
 
 # Function to display link cards properly
 def display_link_card(title, description, image_url, link):
@@ -159,6 +233,9 @@ def display_link_card(title, description, image_url, link):
 # Main Streamlit UI
 def main():
     import asyncio  # Ensure asyncio is available locally
+    if WARM_UP_ON_START:
+        warm_up()
+
     st.markdown(
         """
         <style>
@@ -192,10 +269,12 @@ def main():
     user_input = st.chat_input("Type your message here...")
     if user_input:
         st.session_state["messages"].append({"role": "user", "content": user_input.strip()})
+        with st.chat_message("user"):
+            st.markdown(user_input.strip())
 
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        response = loop.run_until_complete(generate_response(user_input.strip()))
+        # Tokens are produced on the process-wide background loop and drawn as they arrive
+        with st.chat_message("assistant"):
+            response = st.write_stream(iterate_async(stream_response(user_input.strip())))
 
         st.session_state["messages"].append({"role": "assistant", "content": response})
         st.rerun()
@@ -231,4 +310,10 @@ def main():
         )
 
 if __name__ == "__main__":
-    main()
+    import sys
+    if "--profile-startup" in sys.argv:
+        # python app.py --profile-startup [--json] reports cold-start cost instead of serving
+        from startup_profiler import main as profile_main
+        profile_main(sys.argv[1:])
+    else:
+        main()
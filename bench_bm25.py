@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark: BM25 index build and query time.
+#
+# Usage:
+#   python bench_bm25.py                         # the real KB and a synthetic 100k-pair KB
+#   python bench_bm25.py --synthetic 10000 1000000
+#
+# The synthetic knowledge bases are made of words drawn from the real KB's
+# vocabulary with a Zipf-like distribution, with questions, main points and tips
+# of realistic lengths. Queries are the real KB questions plus a few short
+# keyword queries; reciprocal-rank fusion of two result lists is timed as well.
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from bm25_index import BM25Index, qa_document, reciprocal_rank_fusion, tokenize
+
+KEYWORD_QUERIES = ["EC form", "PAL", "Skills for Learning", "DSA", "panic attack", "budget", "exam stress"]
+
+
+def synthetic_qa_pairs(n_pairs, vocabulary, seed=0):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def words(count):
+        return " ".join(rng.choices(vocabulary, weights, k=count))
+
+    return [
+        {
+            "id": f"synthetic_{i:07d}",
+            "question": words(rng.randint(5, 12)) + "?",
+            "answer": {
+                "main_points": [words(rng.randint(8, 25)) for _ in range(rng.randint(1, 4))],
+                "examples": [],
+                "tips": [words(rng.randint(5, 15))] if rng.random() < 0.5 else [],
+                "related_topics": [words(3)] if rng.random() < 0.3 else []
+            }
+        }
+        for i in range(n_pairs)
+    ]
+
+
+def bench(name, qa_pairs, queries, top_k):
+    start = time.perf_counter()
+    index = BM25Index.from_qa_pairs(qa_pairs)
+    build_s = time.perf_counter() - start
+
+    latencies_ms = []
+    for query in queries:
+        start = time.perf_counter()
+        index.query(query, top_k=top_k)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    ranking = [match.id for match in index.query(queries[0], top_k=top_k)]
+    start = time.perf_counter()
+    for _ in range(1000):
+        reciprocal_rank_fusion([ranking, list(reversed(ranking))], top_k=3)
+    fusion_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    p95 = statistics.quantiles(latencies_ms, n=20)[-1]
+    print(f"{name:<18}{len(qa_pairs):>10}{build_s:>10.2f}{statistics.median(latencies_ms):>10.3f}"
+          f"{p95:>10.3f}{fusion_us:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BM25 keyword index.")
+    parser.add_argument("--knowledge-base", default="merged_knowledge_base.json")
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[100_000])
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    with open(args.knowledge_base, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f)["qa_pairs"]
+    queries = [qa["question"] for qa in qa_pairs] + KEYWORD_QUERIES
+
+    # Vocabulary ordered by frequency, so the Zipf weights follow the real distribution
+    counts = {}
+    for qa in qa_pairs:
+        for token in tokenize(qa_document(0, qa)[1]):
+            counts[token] = counts.get(token, 0) + 1
+    vocabulary = sorted(counts, key=counts.get, reverse=True)
+
+    print(f"{'knowledge base':<18}{'pairs':>10}{'build s':>10}{'p50 ms':>10}{'p95 ms':>10}{'RRF us':>12}")
+    bench("real", qa_pairs, queries, args.top_k)
+    for n_pairs in args.synthetic:
+        bench("synthetic", synthetic_qa_pairs(n_pairs, vocabulary), queries, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
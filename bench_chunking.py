@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Micro-benchmark: legacy split_text_by_tokens vs chunking.chunk_text.
+#
+# Usage:
+#   python bench_chunking.py                                  # the markdown knowledge base
+#   python bench_chunking.py /mnt/c/Users/osato/Downloads/extracted_txt/*.txt
+#   python bench_chunking.py --repeat 1 2 4 8                  # grow each document to show scaling
+#
+# The legacy splitter is quadratic, so it is skipped for documents above
+# --legacy-max-tokens to keep the run short.
+
+import argparse
+import glob
+import time
+
+import tiktoken
+
+from chunking import chunk_text
+
+DEFAULT_DOCUMENTS = glob.glob("Comprehensive Academic Success Knowledge Base*.md")
+
+
+def legacy_split_text_by_tokens(text, tokenizer, max_tokens=512):
+    """The original word-by-word splitter from OpenAI Embedding Code-checkpoint.py."""
+    words = text.split()
+    chunks = []
+    current_words = []
+
+    for word in words:
+        current_words.append(word)
+        if len(tokenizer.encode(" ".join(current_words))) > max_tokens:
+            current_words.pop()
+            chunk_str = " ".join(current_words).strip()
+            if chunk_str:
+                chunks.append(chunk_str)
+            current_words = [word]
+
+    if current_words:
+        leftover_str = " ".join(current_words).strip()
+        if leftover_str:
+            chunks.append(leftover_str)
+
+    return chunks
+
+
+def best_of(fn, rounds):
+    best = None
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the token-aware chunker.")
+    parser.add_argument("documents", nargs="*", default=DEFAULT_DOCUMENTS)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--repeat", type=int, nargs="+", default=[1, 4],
+                        help="concatenate each document this many times")
+    parser.add_argument("--legacy-max-tokens", type=int, default=60_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    tokenizer = tiktoken.encoding_for_model("text-embedding-ada-002")
+    print(f"{'document':<40}{'tokens':>9}{'legacy (s)':>12}{'chunk_text (s)':>16}{'speed-up':>10}{'chunks':>8}")
+
+    for path in args.documents:
+        with open(path, "r", encoding="utf-8") as f:
+            base_text = f.read()
+
+        for repeat in args.repeat:
+            text = "\n\n".join([base_text] * repeat)
+            n_tokens = len(tokenizer.encode(text))
+
+            new_s, chunks = best_of(
+                lambda: chunk_text(text, tokenizer, args.max_tokens, overlap=args.overlap), args.rounds
+            )
+            if n_tokens <= args.legacy_max_tokens:
+                legacy_s, _ = best_of(lambda: legacy_split_text_by_tokens(text, tokenizer, args.max_tokens), 1)
+                legacy_col = f"{legacy_s:.3f}"
+                speedup_col = f"{legacy_s / new_s:.0f}x"
+            else:
+                legacy_col, speedup_col = "skipped", "-"
+
+            name = f"{path[-30:]} x{repeat}"
+            print(f"{name:<40}{n_tokens:>9}{legacy_col:>12}{new_s:>16.4f}{speedup_col:>10}{len(chunks):>8}")
+
+
+if __name__ == "__main__":
+    main()
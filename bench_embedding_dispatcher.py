@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark: one embeddings request per query vs the micro-batching dispatcher.
+#
+# Usage (against the local fake server, no API key needed):
+#   python fake_embeddings_server.py --port 8766 --latency-ms 80 &
+#   python bench_embedding_dispatcher.py --base-url http://127.0.0.1:8766/v1 --concurrency 64
+#
+# N distinct questions from the knowledge base are embedded concurrently, first
+# with one embeddings.create call each (what retrieve_chunks did), then through
+# EmbeddingDispatcher. Reported: requests sent, wall time and p50/p95 latency per
+# query, whether both modes returned the same vectors, and the dispatcher's
+# per-batch records.
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from embedding_cache import DEFAULT_EMBEDDING_MODEL
+from embedding_dispatcher import EmbeddingDispatcher
+
+
+def load_questions(path, limit):
+    with open(path, "r", encoding="utf-8") as f:
+        return [qa["question"] for qa in json.load(f)["qa_pairs"]][:limit]
+
+
+async def run(questions, client, model, max_batch, max_wait_ms):
+    async def direct(text):
+        response = await client.embeddings.create(model=model, input=[text])
+        return response.data[0].embedding
+
+    dispatcher = EmbeddingDispatcher(client, model=model, max_batch_size=max_batch, max_wait_ms=max_wait_ms)
+    results = {}
+    for mode, embed in (("one request per query", direct), ("dispatcher", dispatcher.embed)):
+        async def timed(text):
+            start = time.perf_counter()
+            vector = await embed(text)
+            return (time.perf_counter() - start) * 1000, vector
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(timed(text) for text in questions))
+        results[mode] = (time.perf_counter() - start, [ms for ms, _ in timings], [v for _, v in timings])
+    return results, dispatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched query embedding.")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"),
+                        help="e.g. http://127.0.0.1:8766/v1 for fake_embeddings_server.py")
+    parser.add_argument("--api-key", default=os.getenv("OPENAI_API_KEY", "fake-key"))
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--knowledge-base", default="merged_knowledge_base.json")
+    parser.add_argument("--concurrency", type=int, default=64, help="queries fired at once")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    questions = load_questions(args.knowledge_base, args.concurrency)
+    client = AsyncOpenAI(api_key=args.api_key, base_url=args.base_url)
+    results, dispatcher = asyncio.run(run(questions, client, args.model, args.max_batch, args.max_wait_ms))
+
+    print(f"{len(questions)} concurrent queries")
+    print(f"{'mode':<24}{'requests':>9}{'wall s':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    requests = {"one request per query": len(questions), "dispatcher": dispatcher.stats()["requests"]}
+    for mode, (wall_s, latencies_ms, _) in results.items():
+        p95 = statistics.quantiles(latencies_ms, n=20)[-1] if len(latencies_ms) > 1 else latencies_ms[0]
+        print(f"{mode:<24}{requests[mode]:>9}{wall_s:>8.2f}{statistics.median(latencies_ms):>9.1f}{p95:>9.1f}")
+
+    direct_vectors = results["one request per query"][2]
+    batched_vectors = results["dispatcher"][2]
+    print(f"Same vectors in both modes: {direct_vectors == batched_vectors}")
+    print(f"Dispatcher: {dispatcher.stats()}")
+    for record in dispatcher.recent_batches():
+        print(f"   • batch of {record['size']} ({record['unique']} unique, {record['tokens']} tokens) in {record['ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
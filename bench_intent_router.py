@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark and misfire check for the generic intent router.
+#
+# Usage:
+#   python bench_intent_router.py                 # uses intents.json
+#   python bench_intent_router.py --intents my_intents.json --rounds 20000
+#
+# Every message in MISFIRES must go to the retrieval path and every message in
+# EXPECTED must get its intent. Any mistake is listed and the exit status is 1,
+# so this can run as a check after editing intents.json. Timings compare the
+# router with the old substring loop from app.py.
+
+import argparse
+import sys
+import time
+
+from intent_router import INTENTS_PATH, IntentRouter
+
+# Real questions that contain an intent word somewhere; none of these is small talk
+MISFIRES = [
+    "this module is really hard, what can I do?",
+    "Is there support within the university for dyslexia?",
+    "What is the history of the student union?",
+    "which societies can I join?",
+    "How do I find a hidden timetable?",
+    "I feel like I'm drowning in assignments",
+    "thinking of leaving my course",
+    "how do I quit smoking?",
+    "can I exit my accommodation contract early?",
+    "Where is the Hello Desk?",
+    "hi, how do I apply for DSA?",
+    "hello, I need help with my personal statement",
+    "thanks, but how do I book a counselling session?",
+    "how are you supposed to manage five deadlines at once?",
+    "byelaws for student housing",
+    "what should I do if my friend says goodbye and stops replying?",
+    "shipping books home",
+    "chill ways to revise",
+    "bye-laws for the library",
+    "is it ok to ask for an extension?",
+]
+
+EXPECTED = {
+    "hi": "hi",
+    "Hi!": "hi",
+    "hello": "hello",
+    "Hello there :)": "hello",
+    "hey uniease": "hello",
+    "Good morning!": "hello",
+    "how are you?": "how_are_you",
+    "Hi, how are you doing?": "how_are_you",
+    "thanks": "thanks",
+    "Thank you so much!": "thanks",
+    "ok thanks, bye": "bye",
+    "bye": "bye",
+    "Goodbye!": "bye",
+    "exit": "bye",
+    "quit": "bye",
+}
+
+# The substring loop detect_generic_intent used before the router
+LEGACY_INTENTS = {
+    "hello": "Hello! How can I assist you today?",
+    "hi": "Hi! How can I help you?",
+    "how are you": "I'm just a chatbot, but I'm here to help you! What can I do for you?",
+    "bye": "Goodbye! Have a great day!",
+    "exit": "Goodbye! Have a great day!",
+    "quit": "Goodbye! Have a great day!",
+}
+
+
+def legacy_detect_generic_intent(query):
+    query = query.lower().strip()
+    for intent, response in LEGACY_INTENTS.items():
+        if intent in query:
+            return response
+    return None
+
+
+def per_call_us(fn, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            fn(message)
+    return (time.perf_counter() - start) / (rounds * len(messages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and misfire check for intent_router.")
+    parser.add_argument("--intents", default=INTENTS_PATH)
+    parser.add_argument("--rounds", type=int, default=5000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = IntentRouter.from_file(args.intents)
+    print(f"Compiled {len(router.responses)} intents in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    errors = []
+    for message in MISFIRES:
+        intent = router.classify(message)
+        if intent is not None:
+            errors.append(f"misfire: {message!r} -> {intent}")
+    for message, expected in EXPECTED.items():
+        intent = router.classify(message)
+        if intent != expected:
+            errors.append(f"missed:  {message!r} -> {intent} (expected {expected})")
+
+    legacy_misfires = sum(1 for message in MISFIRES if legacy_detect_generic_intent(message))
+    print(f"Misfires: router {sum(e.startswith('misfire') for e in errors)}/{len(MISFIRES)}, "
+          f"legacy substring loop {legacy_misfires}/{len(MISFIRES)}")
+
+    messages = MISFIRES + list(EXPECTED)
+    legacy_us = per_call_us(legacy_detect_generic_intent, messages, args.rounds)
+    router_us = per_call_us(router.route, messages, args.rounds)
+    print(f"{'legacy substring loop':<24}{legacy_us:>8.2f} us/message")
+    print(f"{'intent router':<24}{router_us:>8.2f} us/message")
+
+    if errors:
+        print("\n".join(["❌ Intent router mistakes:"] + errors))
+        return 1
+    print("✅ No misfires")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark: sentiment backends (see sentiment.py) against the full-precision pipeline.
+#
+# Usage:
+#   python bench_sentiment.py                                  # all backends, KB questions
+#   python bench_sentiment.py --backends pytorch quantized --threads 1 2 4
+#   python bench_sentiment.py --model ./local-model-dir --limit 100
+#   python bench_sentiment.py --spike 64 --max-batch 16 --max-wait-ms 10
+#
+# Each backend classifies the knowledge base questions one message at a time,
+# as the app does. Reported: load time, mean/p50/p95 latency per message, and the
+# share of labels that agree with the "pytorch" backend.
+#
+# --spike N simulates N sessions asking at the same moment (a lecture break) and
+# compares one to_thread call per request, as the app used to, with the shared
+# micro-batcher: total throughput and per-request p50/p95 latency.
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from resources import SENTIMENT_MODEL, SENTIMENT_REVISION
+from micro_batcher import MicroBatcher
+from sentiment import BACKENDS, build_sentiment_analyzer, classify_batch
+
+DEFAULT_KNOWLEDGE_BASE = "merged_knowledge_base.json"
+
+
+def load_messages(path, limit):
+    with open(path, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f)["qa_pairs"]
+    return [qa["question"] for qa in qa_pairs][:limit]
+
+
+def run_backend(backend, messages, model, revision, threads):
+    start = time.perf_counter()
+    analyzer = build_sentiment_analyzer(model, revision=revision, backend=backend, threads=threads)
+    analyzer("warm up")
+    load_s = time.perf_counter() - start
+
+    labels = []
+    latencies_ms = []
+    for message in messages:
+        start = time.perf_counter()
+        labels.append(analyzer(message)[0]["label"])
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+    return load_s, labels, latencies_ms
+
+
+async def spike(messages, analyzer, n_requests, max_batch, max_wait_ms):
+    """Latencies (ms) and wall time for n_requests concurrent requests, unbatched and batched."""
+    batcher = MicroBatcher(lambda texts: classify_batch(analyzer, texts),
+                           max_batch_size=max_batch, max_wait_ms=max_wait_ms)
+    modes = {
+        "per-request": lambda text: asyncio.to_thread(lambda: analyzer(text)[0]["label"].lower()),
+        "micro-batched": batcher.submit,
+    }
+    results = {}
+    for mode, classify in modes.items():
+        async def timed(text):
+            start = time.perf_counter()
+            await classify(text)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        latencies_ms = await asyncio.gather(*(timed(messages[i % len(messages)]) for i in range(n_requests)))
+        results[mode] = (time.perf_counter() - start, latencies_ms)
+    return results, batcher.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sentiment backends for latency and label agreement.")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="0 = library default")
+    parser.add_argument("--model", default=SENTIMENT_MODEL)
+    parser.add_argument("--revision", default=SENTIMENT_REVISION)
+    parser.add_argument("--knowledge-base", default=DEFAULT_KNOWLEDGE_BASE)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--spike", type=int, default=0, help="concurrent requests for the spike test")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    messages = load_messages(args.knowledge_base, args.limit)
+    revision = args.revision if args.model == SENTIMENT_MODEL else None
+    backends = ["pytorch"] + [backend for backend in args.backends if backend != "pytorch"]
+    print(f"{len(messages)} messages from {args.knowledge_base}")
+    print(f"{'backend':<12}{'threads':>8}{'load (s)':>10}{'mean ms':>9}{'p50 ms':>8}{'p95 ms':>8}{'agree':>8}")
+
+    reference = None
+    for threads in args.threads:
+        for backend in backends:
+            try:
+                load_s, labels, latencies_ms = run_backend(backend, messages, args.model, revision, threads or None)
+            except ImportError as e:
+                print(f"{backend:<12}{threads or '-':>8}  skipped: {e}")
+                continue
+            if reference is None and backend == "pytorch":
+                reference = labels
+            agreement = sum(a == b for a, b in zip(labels, reference)) / len(labels) if reference else float("nan")
+            p95 = statistics.quantiles(latencies_ms, n=20)[-1] if len(latencies_ms) > 1 else latencies_ms[0]
+            print(f"{backend:<12}{threads or '-':>8}{load_s:>10.2f}{statistics.mean(latencies_ms):>9.2f}"
+                  f"{statistics.median(latencies_ms):>8.2f}{p95:>8.2f}{agreement:>8.1%}")
+
+    if args.spike:
+        analyzer = build_sentiment_analyzer(args.model, revision=revision, backend=backends[-1],
+                                            threads=args.threads[0] or None)
+        analyzer("warm up")
+        results, batcher_stats = asyncio.run(spike(messages, analyzer, args.spike, args.max_batch, args.max_wait_ms))
+        print(f"\nSpike: {args.spike} concurrent requests on {backends[-1]}")
+        print(f"{'mode':<16}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}")
+        for mode, (wall_s, latencies_ms) in results.items():
+            p95 = statistics.quantiles(latencies_ms, n=20)[-1] if len(latencies_ms) > 1 else latencies_ms[0]
+            print(f"{mode:<16}{len(latencies_ms) / wall_s:>9.1f}{statistics.median(latencies_ms):>9.1f}{p95:>9.1f}")
+        print(f"batcher: {batcher_stats}")
+
+
+if __name__ == "__main__":
+    main()
+
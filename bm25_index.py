@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In-process BM25 keyword index over the knowledge base, and reciprocal-rank fusion.
+#
+# Dense retrieval alone matches short keyword queries ("EC form", "PAL",
+# "Skills for Learning") badly, and cannot answer at all without an embedding
+# round-trip. BM25Index is an inverted index over each QA pair's question,
+# main_points, tips and related_topics:
+#   - postings are NumPy arrays (document ids + precomputed BM25 term weights), so
+#     a query is one vectorized add per query term plus an argpartition for top-k
+#   - documents carry the QA id and the {"question", "answer"} metadata that the
+#     vector stores hold, so keyword and vector hits can be fused
+# reciprocal_rank_fusion() merges several ranked id lists by summing 1 / (k + rank);
+# fuse_matches() does the same for lists of Match (e.g. vector store + BM25 results),
+# grouping them by document_id(): vectors written by the embedding script are
+# "<qa id>_chunkN" with a "doc_id" in their metadata, so one QA can come back as
+# several vector ids and must still count (and fill a fused slot) once.
+#
+# bench_bm25.py measures build and query time on the real KB and a synthetic one.
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from vector_store import Match
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+CHUNK_SUFFIX_PATTERN = re.compile(r"_chunk\d+$")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it me my of on or our "
+    "should so that the their there this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def qa_document(idx, qa):
+    """(id, indexed text, metadata) for one QA pair; the id is the QA id the vector stores use."""
+    question = qa.get("question", "").strip()
+    answer = qa.get("answer", {})
+    if not isinstance(answer, dict):
+        answer = {"main_points": [str(answer)]}
+    main_points = answer.get("main_points", [])
+    if not isinstance(main_points, list):
+        main_points = [str(main_points)]
+
+    text = " ".join([question] + main_points + answer.get("tips", []) + answer.get("related_topics", []))
+    doc_id = qa.get("id") or f"qa_{idx}"
+    metadata = {"doc_id": doc_id, "question": question, "answer": " ".join(main_points).strip()}
+    return doc_id, text, metadata
+
+
+class BM25Index:
+    def __init__(self, documents, k1=1.5, b=0.75):
+        """documents: iterable of (id, text, metadata)."""
+        self.ids = []
+        self.metadata = []
+        postings = defaultdict(list)
+        lengths = []
+
+        for doc_index, (doc_id, text, metadata) in enumerate(documents):
+            self.ids.append(doc_id)
+            self.metadata.append(metadata)
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((doc_index, tf))
+
+        n_docs = len(self.ids)
+        lengths = np.asarray(lengths, dtype=np.float32)
+        avg_length = float(lengths.mean()) if n_docs else 0.0
+        length_norm = k1 * (1 - b + b * lengths / (avg_length or 1.0))
+
+        # Store each term's final per-document weight: idf * tf * (k1 + 1) / (tf + norm)
+        self._postings = {}
+        for term, entries in postings.items():
+            docs = np.fromiter((doc for doc, _ in entries), dtype=np.int32, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = (docs, (idf * tfs * (k1 + 1) / (tfs + length_norm[docs])).astype(np.float32))
+
+    @classmethod
+    def from_qa_pairs(cls, qa_pairs, **kwargs):
+        return cls((qa_document(idx, qa) for idx, qa in enumerate(qa_pairs)), **kwargs)
+
+    @classmethod
+    def from_knowledge_base(cls, path, **kwargs):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_qa_pairs(json.load(f).get("qa_pairs", []), **kwargs)
+
+    def count(self):
+        return len(self.ids)
+
+    def query(self, text, top_k=3):
+        """The top_k documents for `text` as Match tuples, best first; documents sharing no term are left out."""
+        postings = [self._postings[term] for term in set(tokenize(text)) if term in self._postings]
+        if not postings:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for docs, weights in postings:
+            scores[docs] += weights  # a term lists each document once, so plain indexing adds correctly
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [Match(self.ids[i], float(scores[i]), self.metadata[i]) for i in candidates]
+
+
+def reciprocal_rank_fusion(rankings, k=60, top_k=None):
+    """
+    Fuse ranked lists of ids: each id scores sum(1 / (k + rank)) over the lists it
+    appears in (rank starting at 1). Returns [(id, score), ...] best first.
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return fused[:top_k] if top_k else fused
+
+
+def document_id(match):
+    """The QA a Match belongs to: its metadata "doc_id", else its id without a "_chunkN" suffix."""
+    return (match.metadata or {}).get("doc_id") or CHUNK_SUFFIX_PATTERN.sub("", match.id)
+
+
+def fuse_matches(match_lists, top_k=3, k=60):
+    """
+    Reciprocal-rank fusion of several lists of Match, by document_id(). Within a list a
+    document ranks at its best chunk; each fused Match is keyed by the document id and
+    keeps the first metadata seen for it.
+    """
+    metadata = {}
+    rankings = []
+    for matches in match_lists:
+        ranking = {}
+        for match in matches:
+            doc_id = document_id(match)
+            metadata.setdefault(doc_id, match.metadata or {})
+            ranking.setdefault(doc_id, None)
+        rankings.append(list(ranking))
+    fused = reciprocal_rank_fusion(rankings, k=k, top_k=top_k)
+    return [Match(doc_id, score, metadata[doc_id]) for doc_id, score in fused]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Token-aware text chunker.
+#
+# The old split_text_by_tokens re-encoded the whole growing chunk after every word,
+# which is quadratic in document length. chunk_text() encodes each document once,
+# then walks the token array choosing cut points:
+#   - a chunk never exceeds max_tokens
+#   - it ends on the last paragraph break in the window if there is one in its
+#     second half, otherwise on the last sentence end, otherwise mid-text
+#   - consecutive chunks share `overlap` tokens of context
+# Chunk text is sliced from the original string by character offsets, so nothing
+# is lost or altered by a decode round-trip. Total cost is O(n log b) for n tokens
+# and b candidate boundaries.
+
+import re
+from bisect import bisect_left, bisect_right
+
+# Each match ends where the previous paragraph/sentence ends. A sentence match stops
+# at its closing punctuation: tiktoken attaches the following space to the next
+# word (" The"), so the cut must land on the token that starts right after the "."
+BOUNDARY_PATTERNS = {
+    "paragraph": re.compile(r"\n\s*\n"),
+    "sentence": re.compile(r"[.!?…][\"')\]]*(?=\s)|\n"),
+}
+
+
+def _boundary_tokens(text, token_starts, pattern):
+    """Token indices at which a new paragraph/sentence begins (the first token starting at or after each match's end)."""
+    positions = []
+    for match in pattern.finditer(text):
+        token_index = bisect_left(token_starts, match.end())
+        if not positions or positions[-1] != token_index:
+            positions.append(token_index)
+    return positions
+
+
+def chunk_text(text, encoding, max_tokens=512, overlap=0, boundaries=("paragraph", "sentence"), tokens=None):
+    """
+    Split `text` into chunks of at most max_tokens tokens of `encoding` (a tiktoken
+    Encoding). Pass `tokens` if the text is already encoded to skip that step.
+    Returns a list of (chunk_text, token_count) tuples.
+    """
+    if max_tokens <= 0:
+        raise ValueError("❌ max_tokens must be positive")
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("❌ overlap must be at least 0 and smaller than max_tokens")
+
+    tokens = encoding.encode(text) if tokens is None else tokens
+    n = len(tokens)
+    if n <= max_tokens:
+        return [(text.strip(), n)] if text.strip() else []
+
+    # Character offset at which each token starts, from a single decode pass
+    _, token_starts = encoding.decode_with_offsets(tokens)
+    boundary_lists = [_boundary_tokens(text, token_starts, BOUNDARY_PATTERNS[kind]) for kind in boundaries]
+
+    def char_offset(token_index):
+        return token_starts[token_index] if token_index < n else len(text)
+
+    chunks = []
+    start = 0
+    min_fill = max_tokens // 2  # don't cut at a boundary that leaves a tiny chunk
+    while start < n:
+        end = min(start + max_tokens, n)
+        if end < n:
+            for positions in boundary_lists:
+                # Last boundary in (start + min_fill, end]
+                i = bisect_right(positions, end) - 1
+                if i >= 0 and positions[i] > start + min_fill:
+                    end = positions[i]
+                    break
+
+        chunk = text[char_offset(start):char_offset(end)].strip()
+        if chunk:
+            chunks.append((chunk, end - start))
+        if end >= n:
+            break
+        start = max(end - overlap, start + 1)
+
+    return chunks
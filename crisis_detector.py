@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Compiled multi-keyword matcher for crisis language.
+#
+# Both places that look for crisis language use it:
+#   - merged_json.add_emergency_flag() tags knowledge base entries "is_emergency"
+#   - app.stream_response() checks each incoming message before any model or
+#     network work, so "I need help now" gets the emergency resources back
+#     straight away instead of waiting for sentiment, embedding, retrieval and GPT
+#
+# KeywordMatcher builds an Aho-Corasick automaton once, so a scan is one pass over
+# the text however many phrases there are. Text and phrases are normalized the same
+# way (lowercase, punctuation runs -> one space), and a phrase only matches whole
+# words: "self-harm" matches "self harm", and "crisis" does not match "crisises".
+
+import re
+from collections import deque
+
+NORMALIZE_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# Messages containing these get the emergency resources without an LLM call.
+# Words such as "urgent" or "emergency" are left out: "emergency extension" or
+# "everything feels urgent" in a question about coursework is not a crisis.
+CRISIS_PHRASES = [
+    "i need help now",
+    "help me now",
+    "in crisis",
+    "suicide",
+    "suicidal",
+    "kill myself",
+    "killing myself",
+    "end my life",
+    "ending my life",
+    "take my own life",
+    "take my life",
+    "end it all",
+    "ending it all",
+    "self harm",
+    "self harming",
+    "selfharm",
+    "harm myself",
+    "harming myself",
+    "hurt myself",
+    "hurting myself",
+    "cut myself",
+    "cutting myself",
+    "want to die",
+    "wanna die",
+    "want to be dead",
+    "wish i was dead",
+    "wish i were dead",
+    "better off dead",
+    "better off without me",
+    "don't want to be alive",
+    "dont want to be alive",
+    "do not want to be alive",
+    "don't want to live anymore",
+    "dont want to live anymore",
+    "do not want to live anymore",
+    "don't want to wake up",
+    "dont want to wake up",
+    "no reason to live",
+    "nothing to live for",
+    "overdose",
+    "overdosed",
+    "overdosing",
+]
+
+# Knowledge base entries mentioning these are emergency resources: crisis language,
+# plus the helplines and immediate-help wording support pages use. Bare "emergency",
+# "urgent" and "crisis" are left out, since "emergency fund", "everything feels
+# urgent" and "family health crisis" are not emergency resources.
+EMERGENCY_KEYWORDS = CRISIS_PHRASES + [
+    "immediate help",
+    "immediate support",
+    "immediate danger",
+    "in danger",
+    "emergency services",
+    "crisis helpline",
+    "crisis line",
+    "crisis support",
+    "crisis situations",
+    "call 999",
+    "nhs 111",
+    "samaritans",
+    "116 123",
+]
+
+
+def normalize(text):
+    """Lowercase and collapse punctuation/whitespace runs to single spaces, padded with spaces."""
+    return " " + NORMALIZE_PATTERN.sub(" ", text.lower()).strip() + " "
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over whole-word `phrases`."""
+
+    def __init__(self, phrases):
+        self.phrases = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for phrase in phrases:
+            # Padding with spaces turns substring matches into whole-word matches
+            pattern = normalize(phrase)
+            if pattern.strip():
+                self._add(pattern, len(self.phrases))
+                self.phrases.append(phrase)
+        self._build_failure_links()
+
+    def _add(self, pattern, index):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _scan(self, text):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield from output[state]
+
+    def find_all(self, text):
+        """Every phrase found in `text`, in order of appearance (phrases repeat if they do)."""
+        return [self.phrases[index] for index in self._scan(text)]
+
+    def search(self, text):
+        """The first phrase found in `text`, or None."""
+        for index in self._scan(text):
+            return self.phrases[index]
+        return None
+
+
+EMERGENCY_MATCHER = KeywordMatcher(EMERGENCY_KEYWORDS)
+CRISIS_MATCHER = KeywordMatcher(CRISIS_PHRASES)
+
+
+def detect_crisis(query):
+    """The crisis phrase in `query`, or None."""
+    return CRISIS_MATCHER.search(query)
+
+
+# Always shown first on the crisis fast path, whatever the knowledge base holds
+CRISIS_HEADER = (
+    "🚨 **If you are in immediate danger, call 999 or go to your nearest A&E.**\n\n"
+    "You can talk to someone right now: **Samaritans** on **116 123** (free, 24/7) "
+    "or **NHS 111** (option 2 for mental health).\n\n"
+)
+
+
+def qa_emergency_text(qa):
+    """The text add_emergency_flag scans: the question and every main point."""
+    answer = qa.get("answer", {})
+    main_points = answer.get("main_points", []) if isinstance(answer, dict) else [str(answer)]
+    return " ".join([qa.get("question", "")] + main_points)
+
+
+def select_emergency_resources(qa_pairs, limit=3):
+    """
+    The `limit` is_emergency entries that mention the most crisis phrases, then the most
+    emergency keywords, in KB order on ties.
+    """
+    def rank(item):
+        position, qa = item
+        text = qa_emergency_text(qa)
+        return -len(CRISIS_MATCHER.find_all(text)), -len(EMERGENCY_MATCHER.find_all(text)), position
+
+    flagged = [qa for qa in qa_pairs if qa.get("is_emergency")]
+    ranked = sorted(enumerate(flagged), key=rank)
+    return [qa for _, qa in ranked[:limit]]
+
+
+def render_emergency_response(resources, max_points=5):
+    """Markdown for the crisis fast path: the fixed header, then each resource's main points."""
+    parts = [CRISIS_HEADER]
+    for qa in resources:
+        main_points = qa.get("answer", {}).get("main_points", [])[:max_points]
+        parts.append(f"**{qa.get('question', '').strip()}**\n")
+        parts.extend(f"- {point.lstrip('- ').strip()}\n" for point in main_points)
+        parts.append("\n")
+    return "".join(parts).rstrip() + "\n"
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Duplicate detection for knowledge base QA pairs.
+#
+# Re-running the extraction pipeline and merging again used to append the same
+# QA pairs over and over, and the copies then crowded the top-k retrieval results.
+# deduplicate_qa_pairs() collapses them in two linear passes:
+#   1. exact: SHA-256 of the normalized (lowercased, punctuation- and
+#      whitespace-collapsed) question + answer text
+#   2. near: MinHash signatures over word shingles, bucketed with LSH so only
+#      pairs that share a band are compared. The band split is chosen so a pair
+#      at the threshold is a candidate at least 99% of the time (see choose_bands).
+#      Candidates are confirmed with the real shingle Jaccard similarity, so the
+#      threshold is exact and LSH only decides what gets looked at
+# The first pair of each group is kept (existing entries come before extracted
+# ones), and every collapsed pair is reported with what it was merged into.
+
+import hashlib
+import re
+from collections import defaultdict
+
+import numpy as np
+
+NORMALIZE_PATTERN = re.compile(r"[^\w]+")
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+# Chance a pair right at the threshold must have of becoming an LSH candidate
+LSH_MIN_RECALL = 0.99
+
+
+def normalize_text(text):
+    """Lowercase, turn punctuation runs into spaces, collapse whitespace."""
+    return " ".join(NORMALIZE_PATTERN.sub(" ", text.lower()).split())
+
+
+def qa_text(qa):
+    """Question plus every part of the answer, as one normalized string."""
+    answer = qa.get("answer", "")
+    if isinstance(answer, dict):
+        parts = [entry for key in ("main_points", "examples", "tips", "related_topics")
+                 for entry in answer.get(key, [])]
+    else:
+        parts = [str(answer)]
+    return normalize_text(" ".join([qa.get("question", "")] + parts))
+
+
+def exact_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def shingles(text, size=3):
+    """Set of hashed `size`-word shingles (the whole text if it is shorter)."""
+    words = text.split()
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little")
+            for gram in grams}
+
+
+def choose_bands(num_perm, threshold, min_recall=LSH_MIN_RECALL):
+    """
+    (bands, rows) with bands * rows == num_perm: the largest `rows` (fewest extra
+    candidates) for which a pair at exactly `threshold` shares a band with
+    probability 1 - (1 - threshold**rows)**bands >= min_recall. Candidates are
+    re-checked with the real Jaccard similarity, so erring low only costs a few
+    comparisons, while a missed candidate is a duplicate left in the output.
+    """
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    recalled = [(b, r) for b, r in options if 1 - (1 - threshold ** r) ** b >= min_recall]
+    return max(recalled, key=lambda br: br[1]) if recalled else (num_perm, 1)
+
+
+class MinHasher:
+    """MinHash signatures with `num_perm` universal hash functions (a*x + b) mod p."""
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MAX_HASH, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        # a, b and the shingle hashes are < 2**32, so a*x + b fits in uint64
+        hashed = (np.outer(values, self.a) + self.b) % MERSENNE_PRIME
+        return (hashed & MAX_HASH).min(axis=0)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def deduplicate_qa_pairs(qa_pairs, threshold=0.85, num_perm=128, shingle_size=3):
+    """
+    Remove exact and near-duplicate QA pairs (shingle Jaccard >= threshold;
+    threshold=None only removes exact duplicates).
+    Returns (kept_pairs, report), where report lists one entry per removed pair:
+    {"removed_id", "kept_id", "question", "kind": "exact" | "near", "similarity"}.
+    A kept pair inherits "is_emergency" from anything collapsed into it.
+    """
+    report = []
+
+    def collapse(kept, removed, kind, similarity):
+        if removed.get("is_emergency"):
+            kept["is_emergency"] = True
+        report.append({
+            "removed_id": removed.get("id"),
+            "kept_id": kept.get("id"),
+            "question": removed.get("question"),
+            "kind": kind,
+            "similarity": round(similarity, 4)
+        })
+
+    # 1. Exact duplicates
+    kept = []
+    texts = []
+    first_by_key = {}
+    for qa in qa_pairs:
+        text = qa_text(qa)
+        key = exact_key(text)
+        if key in first_by_key:
+            collapse(first_by_key[key], qa, "exact", 1.0)
+            continue
+        first_by_key[key] = qa
+        kept.append(qa)
+        texts.append(text)
+
+    if threshold is None or len(kept) < 2:
+        return kept, report
+
+    # 2. Near duplicates: MinHash + LSH banding
+    bands, rows = choose_bands(num_perm, threshold)
+    hasher = MinHasher(num_perm)
+    shingle_sets = [shingles(text, shingle_size) for text in texts]
+    buckets = defaultdict(list)
+    band_keys = []
+    for i, shingle_set in enumerate(shingle_sets):
+        signature = hasher.signature(shingle_set)
+        keys = [signature[band * rows:(band + 1) * rows].tobytes() for band in range(bands)]
+        for band, key in enumerate(keys):
+            buckets[(band, key)].append(i)
+        band_keys.append(keys)
+
+    # Each pair is compared only with earlier surviving pairs it shares a bucket
+    # with, and is folded into the most similar one above the threshold
+    result = []
+    survivors = set()
+    for j, shingle_set in enumerate(shingle_sets):
+        candidates = set()
+        for band in range(bands):
+            candidates.update(i for i in buckets[(band, band_keys[j][band])] if i < j and i in survivors)
+
+        best, best_similarity = None, threshold
+        for i in sorted(candidates):
+            similarity = jaccard(shingle_sets[i], shingle_set)
+            if similarity >= best_similarity and (best is None or similarity > best_similarity):
+                best, best_similarity = i, similarity
+
+        if best is None:
+            survivors.add(j)
+            result.append(kept[j])
+        else:
+            collapse(kept[best], kept[j], "near", best_similarity)
+    return result, report
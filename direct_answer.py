@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Direct answers for questions the knowledge base already contains.
+#
+# Most students ask questions that exist almost word for word as "### Q:" entries,
+# yet every one of them used to pay for a 250-token GPT generation. DirectAnswerMatcher
+# finds the stored question closest to the message and, when the match is confident
+# enough, the app renders that QA pair's structured answer (main points, examples,
+# tips, related topics) itself, with no LLM call:
+#   - an identical question after normalization is a match with confidence 1.0
+#   - otherwise BM25 over the stored questions proposes a few candidates, and the
+#     confidence is the higher of the difflib similarity ratio of the normalized
+#     texts and the Jaccard overlap of their words (so reordered wording still counts),
+#     capped by the share of content words that appear on both sides (allowing
+#     spelling variants such as "organised"/"organized"), so a question that differs
+#     only in its subject ("apply for PAL" vs "apply for DSA") is never a match
+# stats() reports how much of the traffic was answered this way.
+
+import difflib
+import re
+
+from bm25_index import BM25Index, tokenize
+from embedding_cache import normalize_query
+
+WORD_PATTERN = re.compile(r"\w+")
+WORD_VARIANT_RATIO = 0.85
+NESTED_ITEM_PATTERN = re.compile(r"\s+-\s+")
+
+
+def _aligned_share(words, other_words):
+    """Fraction of the content words on both sides that have an equal or near-identical word on the other side."""
+    if not words and not other_words:
+        return 1.0
+
+    def aligned(word, candidates):
+        return word in candidates or any(
+            difflib.SequenceMatcher(None, word, candidate).ratio() >= WORD_VARIANT_RATIO for candidate in candidates
+        )
+
+    hits = sum(aligned(word, other_words) for word in words) + sum(aligned(word, words) for word in other_words)
+    return hits / (len(words) + len(other_words))
+
+
+def _clean_entries(entries):
+    """Drop empty entries and markdown separators ("---") that leak in from the source files."""
+    return [entry.strip() for entry in entries if entry.strip() and entry.strip() != "---"]
+
+
+def _render_point(point):
+    """
+    One main point as a markdown bullet. qa_parser joins a point's nested list onto one
+    line ("Lead:  - item - item" or "- item - item"); those items become sub-bullets.
+    """
+    if point.startswith("- "):
+        lead, items = "", point[2:]
+    elif "  - " in point:
+        lead, _, items = point.partition("  - ")
+    else:
+        return f"- {point}"
+    items = [f"  - {item.strip()}" for item in NESTED_ITEM_PATTERN.split(items) if item.strip()]
+    if not lead.strip():
+        return "\n".join(item[2:] for item in items)
+    return "\n".join([f"- {lead.strip()}"] + items)
+
+
+def render_answer(qa):
+    """A stored QA pair's answer as markdown, laid out like the knowledge base documents."""
+    answer = qa.get("answer", {})
+    if not isinstance(answer, dict):
+        return str(answer)
+
+    parts = [_render_point(point) for point in _clean_entries(answer.get("main_points", []))]
+    examples = _clean_entries(answer.get("examples", []))
+    if examples:
+        parts += ["", "📌 **Example**"] + [f"- {example}" for example in examples]
+    tips = _clean_entries(answer.get("tips", []))
+    if tips:
+        parts += [""] + [f"✅ {tip}" for tip in tips]
+    related_topics = _clean_entries(answer.get("related_topics", []))
+    if related_topics:
+        parts += ["", "📌 **Related Topics**"] + [f"- {topic}" for topic in related_topics]
+    return "\n".join(parts)
+
+
+class DirectAnswerMatcher:
+    def __init__(self, qa_pairs, threshold=0.9, candidates=5):
+        """
+        threshold: minimum confidence (0-1) for a direct answer; above 1 disables the fast path
+        candidates: how many BM25 question matches are compared in full
+        """
+        self.threshold = threshold
+        self.candidates = candidates
+        self.qa_pairs = [qa for qa in qa_pairs if qa.get("question", "").strip()]
+        self.normalized_questions = [normalize_query(qa["question"]) for qa in self.qa_pairs]
+        self._question_words = [set(WORD_PATTERN.findall(question)) for question in self.normalized_questions]
+        self._content_words = [set(tokenize(question)) for question in self.normalized_questions]
+        self._exact = {}
+        for i, question in enumerate(self.normalized_questions):
+            self._exact.setdefault(question, i)
+        self._questions = BM25Index((i, qa["question"], None) for i, qa in enumerate(self.qa_pairs))
+        self.queries = 0
+        self.served = 0
+
+    def best_match(self, query):
+        """(qa_pair, confidence) for the stored question closest to `query`, or (None, 0.0)."""
+        normalized = normalize_query(query)
+        if normalized in self._exact:
+            return self.qa_pairs[self._exact[normalized]], 1.0
+
+        words = set(WORD_PATTERN.findall(normalized))
+        content_words = set(tokenize(normalized))
+        best, best_confidence = None, 0.0
+        for match in self._questions.query(query, top_k=self.candidates):
+            question_words = self._question_words[match.id]
+            confidence = min(
+                max(
+                    difflib.SequenceMatcher(None, normalized, self.normalized_questions[match.id]).ratio(),
+                    len(words & question_words) / len(words | question_words)
+                ),
+                _aligned_share(content_words, self._content_words[match.id])
+            )
+            if confidence > best_confidence:
+                best, best_confidence = self.qa_pairs[match.id], confidence
+        return best, best_confidence
+
+    def answer(self, query):
+        """
+        The rendered stored answer if `query` matches a stored question with at least
+        `threshold` confidence, else None. Every call counts towards stats().
+        """
+        self.queries += 1
+        if self.threshold > 1:
+            return None
+        qa, confidence = self.best_match(query)
+        if qa is None or confidence < self.threshold:
+            return None
+        self.served += 1
+        print(f"⚡ Direct answer ({confidence:.2f}) from {qa.get('id')}; "
+              f"served {self.served}/{self.queries} ({self.served / self.queries:.0%})")
+        return render_answer(qa)
+
+    def stats(self):
+        """Queries seen, queries answered directly and the served fraction."""
+        return {
+            "queries": self.queries,
+            "served": self.served,
+            "served_fraction": self.served / self.queries if self.queries else 0.0,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Binary embedding artifact.
+#
+# A JSON list of floats is huge and slow to parse, so embeddings are stored as:
+#   <base>.npy   one (N, dim) float32 (or float16) matrix in NumPy's .npy format
+#   <base>.json  sidecar with the row ids, per-row metadata, dtype and model name
+#
+# open_embedding_artifact() maps the .npy with mmap, so N worker processes share
+# one page-cached copy of the vectors and opening it costs milliseconds no matter
+# how large the corpus is. Files are replaced atomically (write + os.replace), so
+# processes that already have the old artifact mapped keep a consistent view.
+
+import json
+import os
+
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16")
+
+
+def artifact_paths(path):
+    """Return the (.npy, .json) paths for `path`, with or without an extension."""
+    base, _ = os.path.splitext(path)
+    return base + ".npy", base + ".json"
+
+
+def write_embedding_artifact(path, vectors, ids, metadata=None, dtype="float32", model=None):
+    """Write `vectors` (N x dim) plus ids/metadata as a binary artifact at `path`."""
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"❌ Unsupported artifact dtype {dtype!r}; use one of {SUPPORTED_DTYPES}")
+
+    vectors = np.asarray(vectors, dtype=dtype)
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError(f"❌ Expected {len(ids)} row vectors, got array of shape {vectors.shape}")
+
+    npy_path, json_path = artifact_paths(path)
+    with open(npy_path + ".tmp", "wb") as f:
+        np.save(f, vectors)
+    with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model,
+            "dtype": dtype,
+            "dimension": int(vectors.shape[1]),
+            "count": len(ids),
+            "ids": list(ids),
+            "metadata": list(metadata) if metadata is not None else [{} for _ in ids]
+        }, f, ensure_ascii=False)
+
+    os.replace(npy_path + ".tmp", npy_path)
+    os.replace(json_path + ".tmp", json_path)
+
+
+def open_embedding_artifact(path, mmap=True):
+    """
+    Open an artifact written by write_embedding_artifact().
+    Returns (vectors, sidecar); with mmap=True `vectors` is a read-only memory map.
+    """
+    npy_path, json_path = artifact_paths(path)
+    vectors = np.load(npy_path, mmap_mode="r" if mmap else None)
+    with open(json_path, "r", encoding="utf-8") as f:
+        sidecar = json.load(f)
+    if len(sidecar["ids"]) != len(vectors):
+        raise ValueError(f"❌ {json_path} lists {len(sidecar['ids'])} ids but {npy_path} has {len(vectors)} rows")
+    return vectors, sidecar
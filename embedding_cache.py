@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Query-embedding cache.
+#
+# Repeated questions ("how do I manage stress") used to cost a full embeddings
+# round-trip every time. EmbeddingCache keeps vectors keyed by the normalized query
+# text in an in-memory LRU, and can optionally write them through to a SQLite file
+# so they survive restarts and are shared by every worker process on the machine.
+#
+# get_or_embed() runs on the one event loop every session shares, so it only touches
+# the LRU there: SQLite reads and write-throughs (a shared WAL file with a busy
+# timeout can block for seconds) run on the cache's own single worker thread, and a
+# write-through doesn't hold up the answer at all.
+
+import array
+import asyncio
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+def normalize_query(text):
+    """Normalize a query so trivially different spellings share one cache entry."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" \t\n?!.,;:")
+
+
+def _report_write_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️ Embedding cache write failed: {future.exception()}")
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU of query embeddings with optional on-disk persistence.
+
+    - max_entries: size bound of the in-memory LRU
+    - db_path: SQLite file for the persistent store (None keeps it memory-only)
+    - model: embedding model name, part of every key so a model change never
+      returns stale vectors
+
+    hits / misses count lookups; a memory miss that is found on disk is a hit
+    (it still saves the network round-trip) and is promoted into the LRU.
+    """
+
+    def __init__(self, max_entries=1024, db_path=None, model=DEFAULT_EMBEDDING_MODEL):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()     # LRU and counters
+        self._db_lock = threading.Lock()  # SQLite connection
+        self._db = None
+        self._db_executor = None
+
+        if db_path:
+            # check_same_thread=False: the connection is used by the cache's worker thread
+            # and by callers of the synchronous get/put; every access holds self._db_lock
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, query))"
+            )
+            self._db.commit()
+            # One thread, so reads and writes reach SQLite in the order they were issued
+            self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-cache")
+
+    def _key(self, text):
+        return normalize_query(text)
+
+    def _memory_get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def _disk_get(self, key):
+        """The vector stored on disk for `key` (promoted into the LRU), or None."""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND query = ?",
+                (self.model, key)
+            ).fetchone()
+        if row is None:
+            return None
+        vector = array.array("f", row[0]).tolist()
+        with self._lock:
+            self._remember(key, vector)
+        return vector
+
+    def _disk_put(self, key, vector):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (model, query, vector) VALUES (?, ?, ?)",
+                (self.model, key, array.array("f", vector).tobytes())
+            )
+            self._db.commit()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, text):
+        """Return the cached vector for `text`, or None (blocks on SQLite; async code uses get_or_embed)."""
+        key = self._key(text)
+        vector = self._memory_get(key)
+        if vector is None and self._db is not None:
+            vector = self._disk_get(key)
+        self._count(vector is not None)
+        return vector
+
+    def put(self, text, vector):
+        """Store `vector` for `text` in memory and, if configured, on disk."""
+        key = self._key(text)
+        vector = list(vector)
+        with self._lock:
+            self._remember(key, vector)
+        if self._db is not None:
+            self._disk_put(key, vector)
+
+    def _remember(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_embed(self, text, client, dispatcher=None):
+        """
+        Return the embedding of `text`, calling `client.embeddings.create` only on a miss.
+        With a `dispatcher` (EmbeddingDispatcher) misses are batched with other queries instead.
+        Only the in-memory LRU is used on the event loop; SQLite runs on the cache's worker thread.
+        """
+        key = self._key(text)
+        vector = self._memory_get(key)
+        if vector is None and self._db is not None:
+            vector = await asyncio.get_running_loop().run_in_executor(self._db_executor, self._disk_get, key)
+        self._count(vector is not None)
+        if vector is not None:
+            return vector
+
+        if dispatcher is not None:
+            vector = await dispatcher.embed(text.strip())
+        else:
+            response = await client.embeddings.create(model=self.model, input=[text.strip()])
+            vector = response.data[0].embedding
+        vector = list(vector)
+        with self._lock:
+            self._remember(key, vector)
+        if self._db is not None:
+            # Write through in the background; the answer doesn't wait for the commit
+            write = asyncio.get_running_loop().run_in_executor(self._db_executor, self._disk_put, key, vector)
+            write.add_done_callback(_report_write_error)
+        return vector
+
+    def stats(self):
+        """Hit/miss counters and current size, e.g. for logging or a debug panel."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+            }
+
+    def clear(self):
+        """Drop every cached vector (memory and disk) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM embeddings WHERE model = ?", (self.model,))
+                self._db.commit()
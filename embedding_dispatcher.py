@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Micro-batched query embedding.
+#
+# Each chat message that misses the embedding cache used to send its own
+# single-input embeddings.create request. EmbeddingDispatcher collects the query
+# texts that arrive within `max_wait_ms` of each other (from any session, since
+# they all run on the shared event loop), sends them as one multi-input request
+# of at most `max_batch_size` texts, and hands each caller its own vector.
+# Identical texts in one batch are embedded once.
+#
+# Every batch is recorded (size, unique texts, tokens, latency); stats() sums
+# them up with the queueing numbers from MicroBatcher.
+#
+# fake_embeddings_server.py serves a local stand-in for the embeddings endpoint:
+#   python fake_embeddings_server.py --port 8766
+#   python bench_embedding_dispatcher.py --base-url http://127.0.0.1:8766/v1
+
+import time
+from collections import deque
+
+from embedding_cache import DEFAULT_EMBEDDING_MODEL
+from micro_batcher import MicroBatcher
+
+
+class EmbeddingDispatcher:
+    def __init__(self, client, model=DEFAULT_EMBEDDING_MODEL, max_batch_size=32, max_wait_ms=5.0,
+                 max_concurrent_batches=4, history=100):
+        """
+        client: AsyncOpenAI (or anything with an async embeddings.create)
+        history: how many recent batch records recent_batches() keeps
+        """
+        self.client = client
+        self.model = model
+        self._batcher = MicroBatcher(
+            self._embed_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_concurrent_batches=max_concurrent_batches,
+            name="embeddings"
+        )
+        self._batches = deque(maxlen=history)
+        self._requests = 0
+        self._unique_texts = 0
+        self._tokens = 0
+
+    async def embed(self, text):
+        """The embedding of `text`, fetched together with any other texts queued at the same time."""
+        return await self._batcher.submit(text)
+
+    async def _embed_batch(self, texts):
+        unique_texts = list(dict.fromkeys(texts))
+        started = time.perf_counter()
+        response = await self.client.embeddings.create(model=self.model, input=unique_texts)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        vectors = {
+            unique_texts[item.index]: item.embedding
+            for item in response.data
+        }
+        usage = getattr(response, "usage", None)
+        tokens = getattr(usage, "total_tokens", 0) or 0
+
+        self._requests += 1
+        self._unique_texts += len(unique_texts)
+        self._tokens += tokens
+        self._batches.append({
+            "at": time.time(),
+            "size": len(texts),
+            "unique": len(unique_texts),
+            "tokens": tokens,
+            "ms": round(elapsed_ms, 2)
+        })
+        return [vectors[text] for text in texts]
+
+    def recent_batches(self):
+        """The most recent batch records, oldest first."""
+        return list(self._batches)
+
+    def stats(self):
+        """Totals over all batches: embeddings requests sent, texts embedded, tokens, queueing."""
+        return {
+            **self._batcher.stats(),
+            "requests": self._requests,
+            "unique_texts": self._unique_texts,
+            "tokens": self._tokens,
+        }
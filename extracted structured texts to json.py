@@ -1,8 +1,18 @@
+import argparse
+import hashlib
 import os
-import re
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 
+from qa_parser import generate_id_from_title, iter_qa_pairs, iter_structured_txt_events, parse_structured_txt
+
+def iter_structured_txt_qa_pairs(filepath):
+    """Yield QA pairs one at a time, reading the .txt file lazily (constant memory)."""
+    yield from iter_qa_pairs(iter_structured_txt_events(filepath))
+
+
 def parse_structured_txt_file(filepath):
     """
     Parses a structured Q&A .txt file into a list of Q&A pairs while preserving categories.
@@ -10,134 +20,162 @@ def parse_structured_txt_file(filepath):
       - '##' indicates a category (e.g., ## Mental Health)
       - '### Q:' indicates a question (e.g., ### Q: What is mental health?)
       - '**A:**' starts the answer section.
+    The file is streamed through qa_parser in a single pass.
     """
+    return parse_structured_txt(filepath)
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        lines = f.readlines()
 
-    def generate_id_from_title(title):
-        """Generate a normalized ID from the heading text."""
-        return re.sub(r'[^a-z0-9]+', '_', title.lower().strip()).strip('_')
+def file_sha256(path):
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-    categories = []
-    qa_pairs = []
 
-    current_category_id = None
-    current_category_title = None
-    current_question = None
-    current_answer_lines = []
-    qa_counter = 0
-
-    def store_qa_and_reset():
-        """Save the current Q&A pair to the list and reset accumulators."""
-        nonlocal qa_counter, current_question, current_answer_lines
-
-        if current_category_id and current_question and current_answer_lines:
-            qa_counter += 1
-            qa_id = f"{current_category_id}_{qa_counter:03d}"
-            # Save answer as a dictionary even if it’s a plain text answer.
-            qa_pairs.append({
-                "id": qa_id,
-                "category_id": current_category_id,
-                "question": current_question.strip(),
-                "answer": {
-                    "main_points": [" ".join(current_answer_lines).strip()],
-                    "examples": [],
-                    "tips": [],
-                    "related_topics": []
-                }
-            })
-
-        # Reset variables
-        current_question = None
-        current_answer_lines = []
-
-    for line in lines:
-        line = line.strip()
-
-        if line.startswith("## "):  # New category
-            store_qa_and_reset()  # Store previous QA before changing category
-            current_category_title = line.replace("##", "").strip()
-            current_category_id = generate_id_from_title(current_category_title)
-
-            categories.append({
-                "id": current_category_id,
-                "title": current_category_title,
-                "subcategories": []
-            })
-
-        elif line.startswith("### Q:"):  # New question
-            store_qa_and_reset()  # Store previous QA before new question
-            current_question = line.replace("### Q:", "").strip()
-
-        elif line.startswith("**A:**"):  # Start of answer section
-            current_answer_lines.append(line.replace("**A:**", "").strip())
-
-        elif current_question:  # Capture answer lines until the next question or category
-            current_answer_lines.append(line)
-
-    # Store the last Q&A pair if any
-    store_qa_and_reset()
-
-    return {
-        "categories": categories,
-        "qa_pairs": qa_pairs
-    }
+def load_parse_cache(cache_path):
+    """Per-file parse results from the last run: {fname: {mtime_ns, size, sha256, result}}."""
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable parse cache {cache_path}: {e}")
+        return {}
+
+
+def save_parse_cache(cache_path, cache):
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def write_knowledge_base_streaming(output_json, knowledge_data_header, categories, qa_pairs):
+    """
+    Write the knowledge base JSON one QA pair at a time (same layout as json.dump(indent=2)),
+    so the combined output never has to exist as one big string.
+    """
+    def indented(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+
+    with open(output_json, "w", encoding="utf-8") as out_f:
+        out_f.write('{\n  "metadata": ')
+        out_f.write(json.dumps(knowledge_data_header, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+        for key, entries in (("categories", categories), ("qa_pairs", qa_pairs)):
+            out_f.write(f',\n  "{key}": [')
+            for i, entry in enumerate(entries):
+                out_f.write(("," if i else "") + "\n    " + indented(entry))
+            out_f.write("\n  ]" if entries else "]")
+        out_f.write("\n}")
 
-def convert_structured_txt_folder(input_folder, output_json):
+
+def convert_structured_txt_folder(input_folder, output_json, workers=None, use_cache=True):
     """
     Converts all structured Q&A .txt files into a consolidated JSON file.
     Assumes each .txt file contains structured Q&A with '##' as categories and '### Q:' as questions.
+
+    - Files are parsed in a process pool (workers=None uses every CPU, 1 parses in-process).
+    - Files whose mtime/size or content hash match the last run are not parsed again;
+      their results come from '<output_json>.cache.json' (use_cache=False ignores it).
+    - Files are merged in sorted filename order, so output order and ids are stable.
+      A QA id already used by an earlier file gets the file name appended.
     """
+    started = time.perf_counter()
+    fnames = sorted(fname for fname in os.listdir(input_folder) if fname.lower().endswith(".txt"))
 
-    knowledge_data = {
-        "metadata": {
-            "last_updated": str(date.today()),
-            "version": "1.0",
-            "language": "en",
-            "source": "Extracted Documents (Structured)",
-            "topics_count": 0,
-            "qa_pairs_count": 0
-        },
-        "categories": [],
-        "qa_pairs": []
-    }
+    cache_path = output_json + ".cache.json"
+    old_cache = load_parse_cache(cache_path) if use_cache else {}
+    cache = {}
+    to_parse = []
 
-    existing_cat_ids = set()
-    file_count = 0
+    for fname in fnames:
+        file_path = os.path.join(input_folder, fname)
+        stat = os.stat(file_path)
+        entry = old_cache.get(fname)
 
-    for fname in os.listdir(input_folder):
-        if not fname.lower().endswith(".txt"):
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            cache[fname] = entry
             continue
 
-        file_count += 1
-        file_path = os.path.join(input_folder, fname)
+        sha256 = file_sha256(file_path)
+        if entry and entry["sha256"] == sha256:
+            # Touched but not changed
+            cache[fname] = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            continue
 
-        single_doc_data = parse_structured_txt_file(file_path)
+        cache[fname] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256, "result": None}
+        to_parse.append(fname)
+
+    paths = [os.path.join(input_folder, fname) for fname in to_parse]
+    if workers == 1 or len(paths) < 2:
+        results = map(parse_structured_txt, paths)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        results = pool.map(parse_structured_txt, paths, chunksize=chunksize)
+    try:
+        for fname, result in zip(to_parse, results):
+            cache[fname]["result"] = result
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if use_cache:
+        save_parse_cache(cache_path, cache)
+
+    # Merge in sorted filename order
+    categories = []
+    qa_pairs = []
+    existing_cat_ids = set()
+    existing_qa_ids = set()
+
+    for fname in fnames:
+        single_doc_data = cache[fname]["result"]
 
         # Merge categories
         for cat in single_doc_data["categories"]:
             if cat["id"] not in existing_cat_ids:
-                knowledge_data["categories"].append(cat)
+                categories.append(cat)
                 existing_cat_ids.add(cat["id"])
 
-        # Merge QA pairs
-        knowledge_data["qa_pairs"].extend(single_doc_data["qa_pairs"])
-
-    # Update metadata
-    knowledge_data["metadata"]["topics_count"] = len(knowledge_data["categories"])
-    knowledge_data["metadata"]["qa_pairs_count"] = len(knowledge_data["qa_pairs"])
+        # Merge QA pairs, keeping ids unique across files
+        for qa in single_doc_data["qa_pairs"]:
+            if qa["id"] in existing_qa_ids:
+                qa = {**qa, "id": f"{qa['id']}_{generate_id_from_title(os.path.splitext(fname)[0])}"}
+            existing_qa_ids.add(qa["id"])
+            qa_pairs.append(qa)
+
+    metadata = {
+        "last_updated": str(date.today()),
+        "version": "1.0",
+        "language": "en",
+        "source": "Extracted Documents (Structured)",
+        "topics_count": len(categories),
+        "qa_pairs_count": len(qa_pairs)
+    }
 
     # Save as JSON
-    with open(output_json, "w", encoding="utf-8") as out_f:
-        json.dump(knowledge_data, out_f, indent=2, ensure_ascii=False)
+    write_knowledge_base_streaming(output_json, metadata, categories, qa_pairs)
 
-    print(f"✅ Successfully processed {file_count} .txt files.")
-    print(f"   Categories: {knowledge_data['metadata']['topics_count']}")
-    print(f"   QA Pairs:  {knowledge_data['metadata']['qa_pairs_count']}")
+    elapsed = time.perf_counter() - started
+    print(f"✅ Successfully processed {len(fnames)} .txt files ({len(to_parse)} parsed, "
+          f"{len(fnames) - len(to_parse)} unchanged) in {elapsed:.2f}s.")
+    print(f"   Categories: {metadata['topics_count']}")
+    print(f"   QA Pairs:  {metadata['qa_pairs_count']}")
     print(f"   Output => {output_json}")
 
 if __name__ == "__main__":
-    input_folder = "/mnt/c/Users/osato/Downloads/extracted_txt"
-    output_file ="/mnt/c/Users/osato/openai_setup/extracted_structured.json"
-    convert_structured_txt_folder(input_folder, output_file)
+    parser = argparse.ArgumentParser(description="Convert structured Q&A .txt files into one JSON knowledge base.")
+    parser.add_argument("--input-folder", default="/mnt/c/Users/osato/Downloads/extracted_txt")
+    parser.add_argument("--output", default="/mnt/c/Users/osato/openai_setup/extracted_structured.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parser processes (default: one per CPU; 1 = no pool)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-parse every file even if it hasn't changed")
+    args = parser.parse_args()
+
+    convert_structured_txt_folder(args.input_folder, args.output, workers=args.workers, use_cache=not args.no_cache)
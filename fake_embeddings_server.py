@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Local stand-in for the OpenAI embeddings endpoint, for trying the embedding
+# dispatcher (and the app) without network access or API costs.
+#
+# POST /v1/embeddings returns deterministic unit vectors (the same text always
+# gets the same vector) after an optional artificial latency, and logs how many
+# inputs each request carried, so batching is visible. GET /v1/models answers the
+# warm-up handshake.
+#
+# Usage:
+#   python fake_embeddings_server.py --port 8766 --latency-ms 80
+#   OPENAI_BASE_URL=http://127.0.0.1:8766/v1 python bench_embedding_dispatcher.py
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_embedding(text, dimension):
+    """A unit vector seeded by the text's hash."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0, 1) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+    dimension = 1536
+    latency = 0.0
+    requests_served = 0
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": []})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        inputs = request.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+
+        time.sleep(self.latency)
+        type(self).requests_served += 1
+        print(f"📨 request {type(self).requests_served}: {len(inputs)} input(s)")
+        tokens = sum(len(str(text).split()) for text in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "model": request.get("model"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(str(text), self.dimension)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve fake OpenAI embeddings locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--latency-ms", type=float, default=50, help="artificial time per request")
+    args = parser.parse_args(argv)
+
+    FakeEmbeddingsHandler.dimension = args.dimension
+    FakeEmbeddingsHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), FakeEmbeddingsHandler)
+    print(f"🌐 Fake embeddings on http://{args.host}:{args.port}/v1 ({args.dimension} dims)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Local stand-in for the scraped site, for trying scraper.py without hitting wlv.ac.uk.
+#
+# Serves the files in a directory (default: this one, so /page_source.html works)
+# with ETag and Last-Modified headers, and answers conditional requests with 304.
+# Every request is logged, so a second scraper run should show only 304s.
+#
+# Usage:
+#   python fake_site_server.py --port 8765
+#   python scraper.py http://127.0.0.1:8765/page_source.html --output /tmp/scraped.json --cache /tmp/cache.json
+
+import argparse
+import hashlib
+import io
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ConditionalGetHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        mtime = int(os.path.getmtime(path))
+
+        not_modified = self.headers.get("If-None-Match") == etag
+        if not not_modified and "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since"):
+            try:
+                not_modified = parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp() >= mtime
+            except (TypeError, ValueError):
+                pass
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        if not_modified:
+            self.end_headers()
+            return None
+
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return io.BytesIO(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve HTML files with ETag/Last-Modified support.")
+    parser.add_argument("--directory", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), partial(ConditionalGetHandler, directory=args.directory))
+    print(f"🌐 Serving {args.directory} on http://{args.host}:{args.port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
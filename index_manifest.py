@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Content-hash manifest for incremental re-indexing.
+#
+# The manifest is a small JSON file that remembers, for every QA entry we have
+# embedded, a hash of the exact text we sent to the embedding model (salted with
+# the model name) and the vector ids it produced:
+#
+#   {
+#     "model": "text-embedding-ada-002",
+#     "entries": {
+#       "time_and_task_management_001": {"hash": "...", "vector_ids": ["..."]}
+#     }
+#   }
+#
+# plan() compares it with the current knowledge base, so a run only embeds new or
+# changed entries and deletes the vectors of entries that disappeared.
+
+import hashlib
+import json
+import os
+
+
+def content_hash(text, model):
+    """Hash of the embedded text; the model name is included so a model change re-embeds everything."""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+class IndexManifest:
+    """What is currently in a vector index, keyed by QA id."""
+
+    def __init__(self, path, model):
+        self.path = path
+        self.model = model
+        self.entries = {}
+
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("model") == model:
+                self.entries = data.get("entries", {})
+            else:
+                print(f"⚠️ Manifest was built with {data.get('model')!r}; everything will be re-embedded.")
+
+    def plan(self, texts):
+        """
+        Compare `texts` ({entry_id: text to embed}) with the manifest.
+        Returns (changed_ids, removed_ids): entries to (re-)embed, in input order,
+        and entries whose vectors should be deleted.
+        """
+        changed = [
+            entry_id for entry_id, text in texts.items()
+            if self.entries.get(entry_id, {}).get("hash") != content_hash(text, self.model)
+        ]
+        removed = [entry_id for entry_id in self.entries if entry_id not in texts]
+        return changed, removed
+
+    def vector_ids(self, entry_id):
+        """Vector ids currently stored for `entry_id`."""
+        return list(self.entries.get(entry_id, {}).get("vector_ids", []))
+
+    def record(self, entry_id, text, vector_ids):
+        """Remember that `entry_id` is now embedded from `text` as `vector_ids`."""
+        self.entries[entry_id] = {
+            "hash": content_hash(text, self.model),
+            "vector_ids": list(vector_ids)
+        }
+
+    def forget(self, entry_id):
+        self.entries.pop(entry_id, None)
+
+    def clear(self):
+        self.entries = {}
+
+    def save(self):
+        """Write the manifest atomically so an interrupted run never leaves it half-written."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "entries": self.entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Concurrent embedding + upsert pipeline.
+#
+# The embedding scripts used to send one request at a time with a fixed sleep in
+# between and silently drop chunks whose call failed. ingest() instead:
+#   - keeps up to `concurrency` requests in flight
+#   - paces them with two token buckets, one for requests per minute and one for
+#     tokens per minute, so throughput is set by our OpenAI limits, not by sleeps
+#   - retries transient failures with exponential backoff and full jitter
+#   - appends anything that still fails to a JSONL failure report, which
+#     load_failure_report() turns back into items for a resumed run
+#
+# Items are dicts: {"id": ..., "text": ..., "metadata": {...}}, optionally with a
+# precomputed "tokens" count so texts aren't re-encoded here
+
+import asyncio
+import json
+import os
+import random
+import time
+
+# Status codes worth retrying; any other 4xx is our fault and fails immediately
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# Connection and timeout errors of openai/httpx, requests/urllib3 (Pinecone) and aiohttp
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError",
+    "ConnectError", "ReadError", "WriteError", "RemoteProtocolError", "TimeoutException",
+    "ConnectionError", "Timeout", "ProtocolError", "MaxRetryError", "NewConnectionError", "ReadTimeoutError",
+    "ClientConnectionError", "ServerDisconnectedError",
+}
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `rate_per_minute`.
+    acquire(n) waits until n tokens are available; requests larger than the
+    bucket are clamped to its capacity so they can still go through.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+
+def is_retryable(error):
+    """
+    Rate limits, 5xx, connection problems and timeouts are retryable. Anything else
+    (other 4xx, or a bug such as a TypeError or a dimension-mismatch ValueError)
+    fails at once.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    # Client libraries' own connection/timeout errors, matched by name so they needn't be imported here
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+async def retry_with_backoff(make_call, max_retries=5, base_delay=1.0, max_delay=60.0):
+    """
+    Await make_call() until it succeeds, sleeping a random time in
+    [0, min(max_delay, base_delay * 2**attempt)] between attempts (full jitter).
+    Returns (result, attempts); re-raises the last error when retries run out.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await make_call(), attempt + 1
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                e.attempts = attempt + 1
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            print(f"⚠️ Attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def make_batches(items, max_items, max_tokens):
+    """Group items (each with a "tokens" count) into request-sized batches."""
+    batch = []
+    batch_tokens = 0
+    for item in items:
+        if batch and (len(batch) >= max_items or batch_tokens + item["tokens"] > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(item)
+        batch_tokens += item["tokens"]
+    if batch:
+        yield batch
+
+
+def write_failure(report_path, batch, error, attempts):
+    with open(report_path, "a", encoding="utf-8") as f:
+        for item in batch:
+            f.write(json.dumps({
+                "id": item["id"],
+                "text": item["text"],
+                "metadata": item.get("metadata", {}),
+                "error": str(error),
+                "attempts": attempts,
+                "failed_at": time.time()
+            }, ensure_ascii=False) + "\n")
+
+
+def load_failure_report(report_path):
+    """Items from a failure report, ready to be passed back to ingest(); later entries win."""
+    if not os.path.isfile(report_path):
+        return []
+    items = {}
+    with open(report_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                items[entry["id"]] = {"id": entry["id"], "text": entry["text"], "metadata": entry["metadata"]}
+    return list(items.values())
+
+
+async def ingest(items, client, store, model="text-embedding-ada-002", count_tokens=None,
+                 concurrency=8, requests_per_minute=3000, tokens_per_minute=1_000_000,
+                 batch_size=64, max_batch_tokens=100_000, max_retries=5,
+                 failure_report_path="ingestion_failures.jsonl"):
+    """
+    Embed and upsert `items` with `client` (AsyncOpenAI) into `store` (VectorStore).
+    Each item's text is stored in its metadata as "text_chunk".
+    Returns the set of ids that were upserted; failures go to `failure_report_path`,
+    which is rewritten for this run.
+    """
+    count_tokens = count_tokens or (lambda text: len(text) // 4 + 1)
+    items = [
+        item if "tokens" in item else {**item, "tokens": count_tokens(item["text"])}
+        for item in items
+    ]
+    batches = list(make_batches(items, batch_size, max_batch_tokens))
+
+    request_bucket = TokenBucket(requests_per_minute, capacity=max(1, requests_per_minute // 60))
+    token_bucket = TokenBucket(tokens_per_minute, capacity=max(max_batch_tokens, tokens_per_minute // 60))
+    queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+
+    if os.path.isfile(failure_report_path):
+        os.remove(failure_report_path)
+
+    done_ids = set()
+    failed = 0
+    started = time.perf_counter()
+
+    async def embed(batch):
+        await request_bucket.acquire(1)
+        await token_bucket.acquire(sum(item["tokens"] for item in batch))
+        return await client.embeddings.create(model=model, input=[item["text"] for item in batch])
+
+    async def worker():
+        nonlocal failed
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                response, _ = await retry_with_backoff(lambda: embed(batch), max_retries=max_retries)
+                vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+                vector_items = [
+                    {"id": item["id"], "values": vector,
+                     "metadata": {**item.get("metadata", {}), "text_chunk": item["text"]}}
+                    for item, vector in zip(batch, vectors)
+                ]
+                # Vector store clients are synchronous; keep them off the event loop
+                await retry_with_backoff(
+                    lambda: asyncio.to_thread(store.upsert, vector_items), max_retries=max_retries
+                )
+                done_ids.update(item["id"] for item in batch)
+            except Exception as e:
+                failed += len(batch)
+                write_failure(failure_report_path, batch, e, getattr(e, "attempts", 1))
+                print(f"❌ Batch of {len(batch)} failed for good: {e}")
+
+            elapsed = time.perf_counter() - started
+            print(f"   • {len(done_ids)}/{len(items)} upserted, {failed} failed, {elapsed:.1f}s")
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    if failed:
+        print(f"⚠️ {failed} item(s) failed; see {failure_report_path} (resume with load_failure_report)")
+    return done_ids
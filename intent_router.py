@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Generic intent router: greetings, farewells and small talk.
+#
+# detect_generic_intent() used to check `intent in query` for every intent, so
+# "hi" fired inside "this" or "within" and real questions got a canned greeting.
+# IntentRouter compiles every phrase into a single anchored regex and only fires
+# when the *whole* message is small talk, e.g. "hi", "Hello there!", "hi, how are
+# you?" or "thanks, bye". A message with anything else in it ("hi, how do I apply
+# for DSA?") is left for the retrieval path. When a message holds several intents,
+# the last one picks the reply ("hi how are you" -> how_are_you).
+#
+# Intents, their phrases and replies live in intents.json; `fillers` are words
+# that may appear around the phrases without making the message a question.
+
+import json
+import os
+import re
+
+INTENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json")
+NORMALIZE_PATTERN = re.compile(r"[^a-z0-9]+")
+NAME_PATTERN = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+def normalize(text):
+    """Lowercase, turn punctuation runs into single spaces, trim."""
+    return NORMALIZE_PATTERN.sub(" ", text.lower()).strip()
+
+
+def _phrase_pattern(phrase):
+    return r"\s+".join(re.escape(word) for word in normalize(phrase).split())
+
+
+class IntentRouter:
+    def __init__(self, intents, fillers=(), max_length=100):
+        """
+        intents: [{"name": ..., "phrases": [...], "response": ...}, ...]
+        Messages longer than max_length characters are never small talk.
+        """
+        self.max_length = max_length
+        self.responses = {}
+        alternatives = []
+        for intent in intents:
+            name = intent["name"]
+            if not NAME_PATTERN.fullmatch(name) or name in self.responses:
+                raise ValueError(f"❌ Invalid or duplicate intent name: {name!r}")
+            phrases = sorted({_phrase_pattern(p) for p in intent["phrases"] if normalize(p)}, key=len, reverse=True)
+            if not phrases:
+                raise ValueError(f"❌ Intent {name!r} has no phrases")
+            self.responses[name] = intent["response"]
+            alternatives.append(f"(?P<{name}>{'|'.join(phrases)})")
+
+        filler = "|".join(sorted((_phrase_pattern(f) for f in fillers if normalize(f)), key=len, reverse=True))
+        filler_run = rf"(?:(?:{filler})\b\s*)*" if filler else ""
+        # One or more intent phrases, each optionally surrounded by filler words,
+        # covering the whole normalized message
+        self._pattern = re.compile(
+            rf"{filler_run}(?:(?:{'|'.join(alternatives)})\b\s*{filler_run})+"
+        )
+
+    @classmethod
+    def from_file(cls, path=INTENTS_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["intents"], data.get("fillers", ()))
+
+    def classify(self, query):
+        """The name of the intent `query` consists of, or None if it is anything more."""
+        if len(query) > self.max_length:
+            return None
+        match = self._pattern.fullmatch(normalize(query))
+        return match.lastgroup if match else None
+
+    def route(self, query):
+        """The canned reply for `query`, or None if it should go to the retrieval path."""
+        intent = self.classify(query)
+        return self.responses[intent] if intent else None
@@ -5,6 +5,9 @@ import os
 import json
 import re
 
+from crisis_detector import EMERGENCY_KEYWORDS, EMERGENCY_MATCHER, KeywordMatcher, qa_emergency_text
+from dedup import deduplicate_qa_pairs
+
 def load_json_safely(file_path):
     """Load JSON from file_path safely, returning a dict or None if failure."""
     if not os.path.isfile(file_path):
@@ -17,15 +20,16 @@ def load_json_safely(file_path):
         print(f"❌ Could not decode JSON from {file_path}: {e}")
         return None
 
-def add_emergency_flag(qa_pairs, emergency_keywords):
+def add_emergency_flag(qa_pairs, emergency_keywords=EMERGENCY_KEYWORDS):
     """
     For each QA pair in qa_pairs:
       - Ensure its "answer" is stored as a dictionary with keys:
         "main_points", "examples", "tips", and "related_topics".
-      - Check the first element of "main_points" (converted to lowercase)
-        for any emergency keywords.
+      - Scan the question and every element of "main_points" for any emergency
+        keywords with a compiled matcher (see crisis_detector.py).
       - If a keyword is found, add the flag "is_emergency": true.
     """
+    matcher = EMERGENCY_MATCHER if emergency_keywords == EMERGENCY_KEYWORDS else KeywordMatcher(emergency_keywords)
     for qa in qa_pairs:
         # If the answer is a plain string, wrap it in a dictionary.
         if isinstance(qa.get("answer"), str):
@@ -35,12 +39,18 @@ def add_emergency_flag(qa_pairs, emergency_keywords):
                 "tips": [],
                 "related_topics": []
             }
-        # Get the main text from the first element of main_points (if any)
-        main_text = qa["answer"]["main_points"][0].lower() if qa["answer"]["main_points"] else ""
-        if any(keyword in main_text for keyword in emergency_keywords):
+        if matcher.search(qa_emergency_text(qa)):
             qa["is_emergency"] = True
 
-def merge_knowledge_bases(existing_json_path, new_extracted_json_path, merged_json_path):
+def merge_knowledge_bases(existing_json_path, new_extracted_json_path, merged_json_path,
+                          near_duplicate_threshold=0.85, dedup_report_path=None):
+    """
+    Merge the extracted QA pairs into the existing knowledge base and save the result.
+    Exact duplicates (same normalized question + answer) and near duplicates (shingle
+    Jaccard similarity >= near_duplicate_threshold; None disables this) are collapsed
+    into the first occurrence, existing pairs first. What was collapsed is printed and,
+    if dedup_report_path is given, written there as JSON.
+    """
     # 1. Load existing data
     existing_data = load_json_safely(existing_json_path)
     if existing_data is None:
@@ -53,8 +63,8 @@ def merge_knowledge_bases(existing_json_path, new_extracted_json_path, merged_js
         print("❌ Aborting: missing or invalid extracted QA JSON.")
         return
 
-    # Define keywords that indicate generic emergency advice.
-    emergency_keywords = ["i need help now", "emergency", "urgent", "crisis"]
+    # Keywords that indicate generic emergency advice (shared with the app).
+    emergency_keywords = EMERGENCY_KEYWORDS
 
     # Process existing QA pairs:
     print("🔍 Checking existing QA pairs for emergency keywords...")
@@ -92,9 +102,25 @@ def merge_knowledge_bases(existing_json_path, new_extracted_json_path, merged_js
             # Optionally merge subcategories here if needed.
             pass
 
-    # 6. Merge QA pairs (append new ones to existing ones)
+    # 6. Merge QA pairs (append new ones to existing ones), then drop duplicates
     new_qa_pairs = new_data.get("qa_pairs", [])
-    existing_data["qa_pairs"].extend(new_qa_pairs)
+    combined_qa_pairs = existing_data["qa_pairs"] + new_qa_pairs
+    existing_data["qa_pairs"], dedup_report = deduplicate_qa_pairs(
+        combined_qa_pairs, threshold=near_duplicate_threshold
+    )
+
+    exact_count = sum(1 for entry in dedup_report if entry["kind"] == "exact")
+    print(f"🧹 Collapsed {len(dedup_report)} duplicate QA pairs "
+          f"({exact_count} exact, {len(dedup_report) - exact_count} near) "
+          f"out of {len(combined_qa_pairs)}")
+    for entry in dedup_report[:20]:
+        print(f"   • [{entry['kind']} {entry['similarity']:.2f}] {entry['removed_id']} -> {entry['kept_id']}")
+    if len(dedup_report) > 20:
+        print(f"   • ... and {len(dedup_report) - 20} more")
+    if dedup_report_path:
+        with open(dedup_report_path, "w", encoding="utf-8") as f:
+            json.dump(dedup_report, f, indent=2, ensure_ascii=False)
+        print(f"   Dedup report => {dedup_report_path}")
 
     # 7. Update metadata
     existing_data["metadata"]["topics_count"] = len(existing_data["categories"])
@@ -114,10 +140,13 @@ if __name__ == "__main__":
     existing_kb_path = os.path.join(base_dir, "knowledge_base.json")
     extracted_kb_path = os.path.join(base_dir, "extracted_structured.json")
     merged_output_path = os.path.join(base_dir, "merged_knowledge_base.json")
+    dedup_report_output_path = os.path.join(base_dir, "merge_dedup_report.json")
 
     merge_knowledge_bases(
         existing_json_path=existing_kb_path,
         new_extracted_json_path=extracted_kb_path,
-        merged_json_path=merged_output_path
+        merged_json_path=merged_output_path,
+        near_duplicate_threshold=0.85,
+        dedup_report_path=dedup_report_output_path
     )
 
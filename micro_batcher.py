@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Micro-batching for requests made by many sessions at once.
+#
+# Every Streamlit session runs its coroutines on the same background event loop
+# (resources.get_event_loop), so a batcher living on that loop sees all of them.
+# Callers `await batcher.submit(item)` and get their own result back; behind the
+# scenes items are queued and handed to `process_batch` together:
+#   - a batch is sent as soon as it holds `max_batch_size` items, or
+#   - `max_wait_ms` after its first item arrived, whichever comes first
+# so a lone request waits at most max_wait_ms, while a burst of requests shares
+# a few batched calls instead of making one call each.
+#
+# process_batch(items) -> results (same order) may be a plain function, which is
+# run in a worker thread, or a coroutine function. Up to `max_concurrent_batches`
+# batches are processed at once: 1 suits CPU-bound model inference, more suits
+# network calls.
+
+import asyncio
+import time
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=16, max_wait_ms=5.0, max_concurrent_batches=1, name="batch"):
+        if max_batch_size < 1:
+            raise ValueError("❌ max_batch_size must be at least 1")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self.name = name
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._metrics = {"batches": 0, "items": 0, "errors": 0, "max_batch": 0,
+                         "wait_ms_total": 0.0, "process_ms_total": 0.0}
+
+    async def submit(self, item):
+        """Queue `item` and wait for its result (or the exception its batch raised)."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued without waiting
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            task = loop.create_task(self._run(batch))
+            task.add_done_callback(lambda _: self._slots.release())
+
+    async def _run(self, batch):
+        items = [item for item, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(self.process_batch):
+                results = await self.process_batch(items)
+            else:
+                results = await asyncio.to_thread(self.process_batch, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"❌ {self.name}: got {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self._metrics["errors"] += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record(batch, started)
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, batch, started):
+        metrics = self._metrics
+        metrics["batches"] += 1
+        metrics["items"] += len(batch)
+        metrics["max_batch"] = max(metrics["max_batch"], len(batch))
+        metrics["wait_ms_total"] += sum(started - queued for _, _, queued in batch) * 1000
+        metrics["process_ms_total"] += (time.perf_counter() - started) * 1000
+
+    def stats(self):
+        """Batches, items, errors, largest and mean batch size, mean queue wait and batch time."""
+        metrics = dict(self._metrics)
+        batches, items = metrics["batches"] or 1, metrics["items"] or 1
+        return {
+            "batches": metrics["batches"],
+            "items": metrics["items"],
+            "errors": metrics["errors"],
+            "max_batch": metrics["max_batch"],
+            "mean_batch": round(metrics["items"] / batches, 2),
+            "mean_wait_ms": round(metrics["wait_ms_total"] / items, 2),
+            "mean_process_ms": round(metrics["process_ms_total"] / batches, 2),
+        }
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# PDF -> .txt extraction stage (from "code to convert pdf to txt.ipynb").
+#
+# convert_all_pdfs_in_folder() used to open every PDF one after another, build the
+# text with repeated `text += page.get_text()` and reconvert everything on every run.
+# Now:
+#   - each PDF is converted in its own process-pool task
+#   - page text is streamed straight to the output file (via a temp file + os.replace)
+#   - a cache in the output folder maps each PDF to the SHA-256 of its bytes; PDFs
+#     whose hash hasn't changed and whose .txt is still there are skipped
+#   - every converted file reports its page count and conversion time
+#
+# Requires PyMuPDF (pip install pymupdf).
+#
+# Usage:
+#   python pdf_to_txt.py C:/Users/osato/Downloads/pdf_documents C:/Users/osato/Downloads/extracted_txt
+#   python pdf_to_txt.py IN OUT --workers 4 --force
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+CACHE_FILENAME = ".pdf_to_txt_cache.json"
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def convert_pdf_to_txt(pdf_path, txt_path):
+    """
+    Extract text from a single PDF file and save as TXT.
+    Returns (page_count, seconds).
+    """
+    import fitz  # PyMuPDF
+
+    started = time.perf_counter()
+    tmp_path = txt_path + ".tmp"
+    pages = 0
+    try:
+        with fitz.open(pdf_path) as doc, open(tmp_path, "w", encoding="utf-8") as f:
+            for page in doc:
+                f.write(page.get_text())
+                f.write("\n")
+                pages += 1
+        os.replace(tmp_path, txt_path)
+    except BaseException:
+        # Don't leave a half-written <name>.txt.tmp behind in the output folder
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return pages, time.perf_counter() - started
+
+
+def load_cache(cache_path):
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable cache {cache_path}: {e}")
+        return {}
+
+
+def save_cache(cache_path, cache):
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, cache_path)
+
+
+def convert_all_pdfs_in_folder(input_folder, output_folder, workers=None, force=False):
+    """
+    Convert all PDFs in a folder to TXT files, skipping PDFs that haven't changed
+    since the last run (force=True converts everything).
+    Returns {"converted": [...], "skipped": [...], "failed": [...]} (PDF filenames).
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    cache_path = os.path.join(output_folder, CACHE_FILENAME)
+    cache = {} if force else load_cache(cache_path)
+
+    started = time.perf_counter()
+    report = {"converted": [], "skipped": [], "failed": []}
+    jobs = {}
+
+    for filename in sorted(os.listdir(input_folder)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        pdf_path = os.path.join(input_folder, filename)
+        txt_filename = os.path.splitext(filename)[0] + ".txt"
+        txt_path = os.path.join(output_folder, txt_filename)
+
+        sha256 = file_sha256(pdf_path)
+        entry = cache.get(filename)
+        if entry and entry["sha256"] == sha256 and os.path.isfile(txt_path):
+            report["skipped"].append(filename)
+            continue
+        jobs[filename] = (pdf_path, txt_path, sha256)
+
+    print(f"📄 {len(jobs)} PDF(s) to convert, {len(report['skipped'])} unchanged")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(convert_pdf_to_txt, pdf_path, txt_path): filename
+            for filename, (pdf_path, txt_path, _) in jobs.items()
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            _, txt_path, sha256 = jobs[filename]
+            try:
+                pages, seconds = future.result()
+            except Exception as e:
+                report["failed"].append(filename)
+                print(f"❌ Failed: {filename}: {e}")
+                continue
+            cache[filename] = {"sha256": sha256, "txt": os.path.basename(txt_path)}
+            report["converted"].append(filename)
+            print(f"Converted: {filename} -> {os.path.basename(txt_path)} ({pages} pages, {seconds:.2f}s)")
+
+    # Forget PDFs that are gone from the input folder
+    present = set(report["converted"]) | set(report["skipped"])
+    cache = {filename: entry for filename, entry in cache.items() if filename in present}
+    save_cache(cache_path, cache)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(report['converted'])} converted, {len(report['skipped'])} skipped, "
+          f"{len(report['failed'])} failed in {elapsed:.2f}s")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a folder of PDFs to .txt files.")
+    parser.add_argument("input_folder", nargs="?", default="C:/Users/osato/Downloads/pdf_documents")
+    parser.add_argument("output_folder", nargs="?", default="C:/Users/osato/Downloads/extracted_txt/")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="reconvert every PDF, ignoring the cache")
+    args = parser.parse_args(argv)
+
+    report = convert_all_pdfs_in_folder(args.input_folder, args.output_folder, workers=args.workers, force=args.force)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
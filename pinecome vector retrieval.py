@@ -14,6 +14,8 @@ import streamlit as st
 import openai
 from openai import AsyncOpenAI
 from pinecone import Pinecone
+from intent_router import IntentRouter
+from vector_store import PineconeVectorStore
 
 # ✅ Access API keys securely
 OPENAI_API_KEY = st.secrets["openai_api_key"]
@@ -34,6 +36,7 @@ aclient = AsyncOpenAI(api_key=OPENAI_API_KEY)
 pc = Pinecone(api_key=PINECONE_API_KEY)
 
 index = pc.Index("ai-powered-chatbot")
+vector_store = PineconeVectorStore(index)
 
 print("✅ API keys loaded successfully!")
 print("✅ Pinecone and OpenAI clients initialized!")
@@ -56,21 +59,11 @@ def speak_response(text):
     except OSError as e:
         print(f"Error accessing the microphone: {e}")
 
-# ✅ Generic Intent Responses
-GENERIC_INTENTS = {
-    "hello": "Hello! How can I assist you today?",
-    "hi": "Hi! How can I help you?",
-    "how are you": "I'm just a chatbot, but I'm here to help you! What can I do for you?",
-    "bye": "Goodbye! Have a great day!",
-    "exit": "Goodbye! Have a great day!",
-    "quit": "Goodbye! Have a great day!",
-}
+# ✅ Generic Intent Responses (whole-message match, see intent_router.py / intents.json)
+intent_router = IntentRouter.from_file()
+
 def detect_generic_intent(query):
-    query = query.lower().strip()
-    for intent, response in GENERIC_INTENTS.items():
-        if intent in query:
-            return response
-    return None
+    return intent_router.route(query)
 
 # ------------------------------------------------------------
 # 2. SENTIMENT ANALYSIS
@@ -90,15 +83,11 @@ async def retrieve_chunks(query, top_k=2):
         )
         query_embedding = response.data[0].embedding
 
-        # Query Pinecone
-        result = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
+        # Query the vector store
+        matches = vector_store.query(query_embedding, top_k=top_k)
 
         # Extract answers from matches
-        return [match.metadata.get("answer", "") for match in result.matches]
+        return [match.metadata.get("answer", "") for match in matches]
     except Exception as e:
         print(f"❌ Error retrieving chunks: {e}")
         return []
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Streaming Q&A parser shared by the knowledge base converters.
+#
+# Both "Knowledge Base to JSON" (markdown) and "extracted structured texts to json"
+# (structured .txt) read documents laid out as:
+#
+#   ## Category title
+#   ### Q: Question text?
+#   **A:** First answer line
+#   more answer lines ...
+#
+# iter_qa_events() reads the file lazily, one line at a time, matches each line
+# against precompiled patterns and yields events as soon as they are complete:
+#   ("category", {"id": ..., "title": ..., "subcategories": []})
+#   ("qa", {"id": ..., "category_id": ..., "question": ..., "answer": {...}})
+# so arbitrarily large documents are parsed in constant memory. How the answer
+# lines are turned into an answer dict is up to the caller (build_answer).
+
+import re
+
+CATEGORY_PATTERN = re.compile(r"## (.*)", re.S)
+QUESTION_PATTERN = re.compile(r"### Q:(.*)", re.S)
+ANSWER_PATTERN = re.compile(r"\*\*A:\*\*(.*)", re.S)
+
+# Markdown answer markers (matched against stripped lines)
+EXAMPLE_MARKER = re.compile(r"📌 \*\*example\*\*", re.I)
+RELATED_TOPICS_MARKER = re.compile(r"📌 \*\*related topics\*\*", re.I)
+BULLET_PATTERN = re.compile(r"[-*+]\s")
+NON_ID_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+def generate_id_from_title(title):
+    """Lowercase, replace runs of non-alphanumerics with underscores, trim underscores."""
+    return NON_ID_CHARS.sub("_", title.lower().strip()).strip("_")
+
+
+def parse_markdown_answer(answer_lines):
+    """
+    Parse the lines of a markdown answer into:
+      - main_points (list)
+      - examples (list)        => lines after "📌 **Example**"
+      - tips (list)            => lines that start with "✅ "
+      - related_topics (list)  => lines after "📌 **Related Topics**"
+    """
+    sections = {"main_points": [], "examples": [], "tips": [], "related_topics": []}
+    target = sections["main_points"]
+
+    for line in answer_lines:
+        line_stripped = line.strip()
+
+        if EXAMPLE_MARKER.match(line_stripped):
+            target = sections["examples"]
+            continue
+        if RELATED_TOPICS_MARKER.match(line_stripped):
+            target = sections["related_topics"]
+            continue
+        if line_stripped.startswith("✅ "):
+            sections["tips"].append(line_stripped[2:].strip())
+            continue
+
+        if BULLET_PATTERN.match(line_stripped):
+            target.append(line_stripped[2:].strip())
+        else:
+            target.append(line_stripped)
+
+    return {key: [entry for entry in values if entry] for key, values in sections.items()}
+
+
+def join_answer_lines(answer_lines):
+    """Plain-text answer: every line joined into a single main point."""
+    return {
+        "main_points": [" ".join(answer_lines).strip()],
+        "examples": [],
+        "tips": [],
+        "related_topics": []
+    }
+
+
+def iter_qa_events(lines, build_answer, strip_lines=False, require_category=False,
+                   keep_empty_answer_marker=False):
+    """
+    Single pass over `lines` (any iterable, e.g. an open file) yielding
+    ("category", category) and ("qa", qa_pair) events in document order.
+
+    - build_answer: callable turning the collected answer lines into an answer dict
+    - strip_lines: strip every line before matching (structured .txt files) instead
+      of matching raw lines (markdown, where indentation matters)
+    - require_category: drop questions that appear before any "## " heading
+    - keep_empty_answer_marker: keep an empty line for a bare "**A:**" marker
+    QA ids are "<category_id>_<running number>", numbered across the whole document.
+    """
+    category_id = None
+    question = None
+    answer_lines = []
+    qa_counter = 0
+
+    def finish_qa():
+        nonlocal qa_counter
+        if question and answer_lines and (category_id or not require_category):
+            qa_counter += 1
+            return {
+                "id": f"{category_id}_{qa_counter:03d}",
+                "category_id": category_id,
+                "question": question.strip(),
+                "answer": build_answer(answer_lines)
+            }
+        return None
+
+    for line in lines:
+        if strip_lines:
+            line = line.strip()
+
+        match = CATEGORY_PATTERN.match(line)
+        if match:
+            qa_pair = finish_qa()
+            if qa_pair:
+                yield "qa", qa_pair
+            question, answer_lines = None, []
+
+            title = match.group(1).strip()
+            category_id = generate_id_from_title(title)
+            yield "category", {"id": category_id, "title": title, "subcategories": []}
+            continue
+
+        match = QUESTION_PATTERN.match(line)
+        if match:
+            qa_pair = finish_qa()
+            if qa_pair:
+                yield "qa", qa_pair
+            question, answer_lines = match.group(1).strip(), []
+            continue
+
+        if not question:
+            continue
+
+        match = ANSWER_PATTERN.match(line if strip_lines else line.strip())
+        if match:
+            answer_part = match.group(1).strip()
+            if answer_part or keep_empty_answer_marker:
+                answer_lines.append(answer_part)
+        else:
+            answer_lines.append(line)
+
+    qa_pair = finish_qa()
+    if qa_pair:
+        yield "qa", qa_pair
+
+
+def iter_markdown_events(md_file_path):
+    """Stream events from a markdown knowledge base file."""
+    with open(md_file_path, "r", encoding="utf-8") as f:
+        yield from iter_qa_events(f, parse_markdown_answer)
+
+
+def iter_structured_txt_events(filepath):
+    """Stream events from a structured Q&A .txt file."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        yield from iter_qa_events(
+            f, join_answer_lines, strip_lines=True, require_category=True, keep_empty_answer_marker=True
+        )
+
+
+def parse_structured_txt(filepath):
+    """Collect one structured .txt file into {"categories": [...], "qa_pairs": [...]}.
+    Top-level so it can be sent to a process pool."""
+    categories = []
+    qa_pairs = []
+    for kind, payload in iter_structured_txt_events(filepath):
+        if kind == "category":
+            categories.append(payload)
+        else:
+            qa_pairs.append(payload)
+    return {"categories": categories, "qa_pairs": qa_pairs}
+
+
+def iter_qa_pairs(events):
+    """Only the QA pairs from an event stream."""
+    for kind, payload in events:
+        if kind == "qa":
+            yield payload
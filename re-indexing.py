@@ -1,9 +1,13 @@
+import argparse
 import json
 import os
 import time
+import tiktoken
 from openai import OpenAI
-from pinecone import Pinecone
 from dotenv import load_dotenv
+from index_manifest import IndexManifest
+from response_cache import mark_index_updated
+from vector_store import LocalVectorStore, PineconeVectorStore
 
 # Load environment variables
 load_dotenv()
@@ -13,12 +17,21 @@ PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENV = os.getenv("PINECONE_ENV")
 
 client = OpenAI(api_key=OPENAI_API_KEY)
-pc = Pinecone(api_key=PINECONE_API_KEY, environment=PINECONE_ENV)
-index = pc.Index("ai-powered-chatbot")
+
+
+def get_pinecone_store():
+    """Connect to the production Pinecone index (only when we actually write to it)."""
+    from pinecone import Pinecone
+
+    pc = Pinecone(api_key=PINECONE_API_KEY, environment=PINECONE_ENV)
+    return PineconeVectorStore(pc.Index("ai-powered-chatbot"))
 
 
 # Path to merged knowledge base
 MERGED_JSON_PATH = "/mnt/c/Users/osato/openai_setup/merged_knowledge_base.json"
+# What is currently in the Pinecone index (a local store keeps its own next to it)
+MANIFEST_PATH = "/mnt/c/Users/osato/openai_setup/reindex_manifest.json"
+EMBEDDING_MODEL = "text-embedding-ada-002"
 
 if not os.path.isfile(MERGED_JSON_PATH):
     raise FileNotFoundError("❌ Merged knowledge base file not found.")
@@ -30,42 +43,187 @@ with open(MERGED_JSON_PATH, "r", encoding="utf-8") as f:
 qa_pairs = knowledgebase.get("qa_pairs", [])
 print(f"✅ Loaded {len(qa_pairs)} QA pairs from merged file.")
 
-# Re-index the knowledge base
-def index_qa_pairs(pairs):
-    for idx, qa in enumerate(pairs):
-        question = qa.get("question", "").strip()
+# Batching limits: OpenAI accepts up to 2048 inputs and ~300k tokens per embeddings
+# request; we stay well under both by default
+EMBED_BATCH_SIZE = 256
+EMBED_BATCH_MAX_TOKENS = 100_000
+UPSERT_BATCH_SIZE = 100
+# Pinecone accepts at most 1000 ids per delete request
+DELETE_BATCH_SIZE = 1000
 
-        # Ensure "main_points" is a list and join its elements into a single string
-        answer_list = qa.get("answer", {}).get("main_points", [])
-        if isinstance(answer_list, list):
-            answer = " ".join(answer_list).strip()
-        else:
-            answer = str(answer_list).strip()  # Handle unexpected cases
+tokenizer = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+
+
+def build_qa_record(idx, qa):
+    """Return the id, embedded text and metadata for one QA pair."""
+    question = qa.get("question", "").strip()
+
+    # Ensure "main_points" is a list and join its elements into a single string
+    answer_list = qa.get("answer", {}).get("main_points", [])
+    if isinstance(answer_list, list):
+        answer = " ".join(answer_list).strip()
+    else:
+        answer = str(answer_list).strip()  # Handle unexpected cases
+
+    full_text = f"Q: {question}\nA: {answer}"
+    return {
+        # Stable QA ids keep the manifest valid when entries are inserted or removed
+        "id": qa.get("id") or f"qa_{idx}",
+        "text": full_text,
+        "metadata": {
+            "question": question,
+            "answer": answer
+        }
+    }
+
+
+def batch_by_token_budget(records, max_items, max_tokens):
+    """Group records into batches of at most max_items inputs and max_tokens tokens."""
+    batch = []
+    batch_tokens = 0
+    for record in records:
+        tokens = len(tokenizer.encode(record["text"]))
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch, batch_tokens
+            batch = []
+            batch_tokens = 0
+        batch.append(record)
+        batch_tokens += tokens
+    if batch:
+        yield batch, batch_tokens
+
+
+def delete_positional_ids(store, count):
+    """
+    Delete the positional ids (qa_0 .. qa_{count-1}) that indexes built before the
+    manifest existed used, so they don't linger next to the stable QA ids.
+    Ids that are not in the store are ignored.
+    """
+    ids = [f"qa_{idx}" for idx in range(count)]
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        store.delete(ids[start:start + DELETE_BATCH_SIZE])
+    print(f"🧹 No manifest yet: deleted the legacy positional ids qa_0..qa_{count - 1}.")
+
+
+# Re-index the knowledge base: one embeddings request per batch, upserts in chunks.
+# With a manifest, only new or changed entries are embedded and removed ones are deleted.
+def index_qa_pairs(pairs, store, manifest=None, batch_size=EMBED_BATCH_SIZE,
+                   max_batch_tokens=EMBED_BATCH_MAX_TOKENS, upsert_batch_size=UPSERT_BATCH_SIZE):
+    records = [build_qa_record(idx, qa) for idx, qa in enumerate(pairs)]
+    removed = []
+
+    if manifest is not None:
+        changed, removed = manifest.plan({record["id"]: record["text"] for record in records})
+        stale_ids = [vector_id for entry_id in removed for vector_id in manifest.vector_ids(entry_id)]
+        if stale_ids:
+            store.delete(stale_ids)
+        for entry_id in removed:
+            manifest.forget(entry_id)
 
-        full_text = f"Q: {question}\nA: {answer}"
+        changed = set(changed)
+        unchanged = len(records) - len(changed)
+        records = [record for record in records if record["id"] in changed]
+        print(f"🔍 {len(records)} new or changed, {len(removed)} removed, {unchanged} unchanged.")
 
-        # Generate embeddings
+    total = len(records)
+    done = 0
+    started = time.perf_counter()
+
+    for batch, batch_tokens in batch_by_token_budget(records, batch_size, max_batch_tokens):
+        # Generate embeddings for the whole batch in one request
         response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=full_text
+            model=EMBEDDING_MODEL,
+            input=[record["text"] for record in batch]
         )
-        vector = response.data[0].embedding
-
-        # Upsert into Pinecone
-        index.upsert([
-            {
-                "id": f"qa_{idx}",
-                "values": vector,
-                "metadata": {
-                    "question": question,
-                    "answer": answer
-                }
-            }
-        ], )
-
-        time.sleep(0.1)  # Avoid hitting rate limits
+        # The API returns one item per input; order by index to be safe
+        vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+        vector_items = [
+            {"id": record["id"], "values": vector, "metadata": record["metadata"]}
+            for record, vector in zip(batch, vectors)
+        ]
+
+        # Upsert into the vector store (Pinecone or local) in configurable chunks
+        for start in range(0, len(vector_items), upsert_batch_size):
+            store.upsert(vector_items[start:start + upsert_batch_size])
+
+        if manifest is not None:
+            for record in batch:
+                manifest.record(record["id"], record["text"], [record["id"]])
+
+        done += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"   • {done}/{total} QA pairs indexed (batch of {len(batch)}, {batch_tokens} tokens, {elapsed:.1f}s)")
+
+    return total, len(removed)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-index the merged knowledge base.")
+    parser.add_argument("--local", metavar="PATH",
+                        help="build a local NumPy vector store at PATH instead of updating Pinecone")
+    parser.add_argument("--ann-lists", type=int, metavar="N",
+                        help="with --local, also build an IVF ANN index with N lists (0 = auto)")
+    parser.add_argument("--ann-probe", type=int, default=8, metavar="N",
+                        help="lists searched per query by the ANN index (default: 8)")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32",
+                        help="with --local, precision of the saved vectors (default: float32)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE,
+                        help=f"max inputs per embeddings request (default: {EMBED_BATCH_SIZE})")
+    parser.add_argument("--max-batch-tokens", type=int, default=EMBED_BATCH_MAX_TOKENS,
+                        help=f"max tokens per embeddings request (default: {EMBED_BATCH_MAX_TOKENS})")
+    parser.add_argument("--upsert-batch-size", type=int, default=UPSERT_BATCH_SIZE,
+                        help=f"vectors per upsert call (default: {UPSERT_BATCH_SIZE})")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="clear the index and manifest and re-embed every QA pair")
+    args = parser.parse_args()
+
+    batching = {
+        "batch_size": args.batch_size,
+        "max_batch_tokens": args.max_batch_tokens,
+        "upsert_batch_size": args.upsert_batch_size,
+    }
+
     print("🔄 Re-indexing QA pairs...")
-    index_qa_pairs(qa_pairs)
-    print("✅ Pinecone index updated.")
+    if args.local:
+        base, _ = os.path.splitext(args.local)
+        manifest = IndexManifest(base + ".manifest.json", EMBEDDING_MODEL)
+        if os.path.isfile(base + ".npy") and not args.rebuild:
+            store = LocalVectorStore.load(args.local)
+            store.dtype = args.dtype
+        else:
+            store = LocalVectorStore(dtype=args.dtype)
+            manifest.clear()  # nothing to be incremental against
+    else:
+        manifest = IndexManifest(MANIFEST_PATH, EMBEDDING_MODEL)
+        store = get_pinecone_store()
+        if args.rebuild:
+            store.clear()
+            manifest.clear()
+
+    # An index written before the manifest existed holds vectors under positional
+    # qa_N ids, while records now use the stable QA ids: drop the old ones first
+    if not os.path.isfile(manifest.path) and store.count():
+        delete_positional_ids(store, max(len(qa_pairs), store.count()))
+
+    try:
+        embedded, removed = index_qa_pairs(qa_pairs, store, manifest=manifest, **batching)
+    finally:
+        # Keep whatever was upserted before a failure, so the next run resumes from there
+        if args.local:
+            store.save(args.local, model=EMBEDDING_MODEL)
+        manifest.save()
+
+    if args.local:
+        if args.ann_lists is not None:
+            store.build_ann(n_lists=args.ann_lists or None, n_probe=args.ann_probe)
+            store.save(args.local, model=EMBEDDING_MODEL)
+        print(f"✅ Local vector store saved to: {args.local}")
+    else:
+        print("✅ Pinecone index updated.")
+
+    if embedded or removed:
+        # Cached chatbot answers were generated from the old index
+        mark_index_updated(qa_pairs_count=len(qa_pairs), embedded=embedded, removed=removed)
+    else:
+        print("✅ Index already up to date.")
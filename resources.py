@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Process-wide resources for the Streamlit app.
+#
+# Streamlit re-runs app.py from top to bottom on every chat message, so anything
+# expensive (the DistilBERT pipeline, the OpenAI client, the Pinecone index handle)
+# is built here behind st.cache_resource. The builders run once per server process
+# and the same objects are shared by every session.
+#
+# The heavy libraries (openai, pinecone, transformers -> torch) are imported inside
+# the builders, so importing this module (and app.py) stays cheap and a message
+# answered by detect_generic_intent never pays for them.
+
+import asyncio
+import os
+import threading
+import streamlit as st
+
+PINECONE_INDEX_NAME = "ai-powered-chatbot"
+SENTIMENT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+SENTIMENT_REVISION = "714eb0f"
+
+# Sentiment: when it runs ("off", the default, never loads the model; "inline" sets
+# the prompt's tone; "after" only logs the label once the answer is sent), which CPU
+# backend runs it ("pytorch", "quantized" int8 or "onnx", see sentiment.py) and how
+# many threads that backend may use
+SENTIMENT_MODE = os.getenv("UNIEASE_SENTIMENT_MODE", "off")
+SENTIMENT_BACKEND = os.getenv("UNIEASE_SENTIMENT_BACKEND", "pytorch")
+SENTIMENT_THREADS = int(os.getenv("UNIEASE_SENTIMENT_THREADS", "0")) or None
+# Concurrent sentiment requests from all sessions are batched: at most this many
+# per forward pass, waiting at most this long for a batch to fill
+SENTIMENT_MAX_BATCH = int(os.getenv("UNIEASE_SENTIMENT_MAX_BATCH", "16"))
+SENTIMENT_MAX_WAIT_MS = float(os.getenv("UNIEASE_SENTIMENT_MAX_WAIT_MS", "10"))
+
+# Retrieval backend: "pinecone" (default) or "local" (in-process NumPy store saved by
+# `python re-indexing.py --local PATH`)
+VECTOR_STORE_BACKEND = os.getenv("UNIEASE_VECTOR_STORE", "pinecone")
+LOCAL_VECTOR_STORE_PATH = os.getenv("UNIEASE_LOCAL_VECTOR_STORE", "local_vector_store.npy")
+# Lists probed per query when the local store has an ANN index (recall vs latency)
+ANN_N_PROBE = os.getenv("UNIEASE_ANN_N_PROBE")
+
+# Retrieval: "hybrid" fuses vector and BM25 keyword results (reciprocal-rank fusion),
+# "vector" or "bm25" use one of them; "bm25" needs no embedding call at all.
+# A query embedding slower than UNIEASE_EMBEDDING_TIMEOUT seconds is abandoned and
+# hybrid retrieval falls back to BM25 alone (0 waits as long as it takes).
+RETRIEVAL_MODE = os.getenv("UNIEASE_RETRIEVAL", "hybrid")
+EMBEDDING_TIMEOUT = float(os.getenv("UNIEASE_EMBEDDING_TIMEOUT", "3")) or None
+# Candidates taken from each retriever before fusion
+RETRIEVAL_CANDIDATES = int(os.getenv("UNIEASE_RETRIEVAL_CANDIDATES", "10"))
+
+# Query-embedding cache: LRU size and optional SQLite file shared by worker processes
+EMBEDDING_CACHE_SIZE = int(os.getenv("UNIEASE_EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_DB = os.getenv("UNIEASE_EMBEDDING_CACHE_DB") or None
+
+# Query embeddings that miss the cache are sent together: at most this many texts
+# per embeddings request, waiting at most this long for a batch to fill
+EMBEDDING_MAX_BATCH = int(os.getenv("UNIEASE_EMBEDDING_MAX_BATCH", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("UNIEASE_EMBEDDING_MAX_WAIT_MS", "5"))
+
+# Semantic response cache: similarity threshold, entry lifetime and size bound
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("UNIEASE_RESPONSE_CACHE_THRESHOLD", "0.95"))
+RESPONSE_CACHE_TTL = float(os.getenv("UNIEASE_RESPONSE_CACHE_TTL", str(24 * 3600)))
+RESPONSE_CACHE_SIZE = int(os.getenv("UNIEASE_RESPONSE_CACHE_SIZE", "1000"))
+
+# Questions matching a stored "### Q:" with at least this confidence (0-1) are answered
+# straight from the knowledge base, with no LLM call; above 1 turns the fast path off
+DIRECT_ANSWER_THRESHOLD = float(os.getenv("UNIEASE_DIRECT_ANSWER_THRESHOLD", "0.9"))
+
+# Knowledge base JSON the crisis and direct-answer fast paths read
+KNOWLEDGE_BASE_PATH = os.getenv(
+    "UNIEASE_KNOWLEDGE_BASE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "merged_knowledge_base.json")
+)
+
+# Greeting/small-talk intents and replies (see intent_router.py)
+INTENTS_PATH = os.getenv("UNIEASE_INTENTS") or None
+
+# Set UNIEASE_WARM_UP=0 to skip the warm-up on the first run of the app
+WARM_UP_ON_START = os.getenv("UNIEASE_WARM_UP", "1") != "0"
+
+
+def get_api_keys():
+    """Read the API keys from Streamlit secrets, failing loudly if either is missing."""
+    openai_api_key = st.secrets["openai_api_key"]
+    pinecone_api_key = st.secrets["pinecone_api_key"]
+
+    if not openai_api_key:
+        raise ValueError("❌ OPENAI_API_KEY not found! Check your Streamlit secrets.")
+    if not pinecone_api_key:
+        raise ValueError("❌ PINECONE_API_KEY not found! Check your Streamlit secrets.")
+
+    return openai_api_key, pinecone_api_key
+
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop():
+    """
+    One long-lived event loop per process, running forever in a daemon thread.
+    Every session submits its coroutines here (see run_async), so the AsyncOpenAI
+    HTTP connection pool stays bound to a single loop and connections are kept
+    alive across messages instead of being rebuilt for each one.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="uniease-event-loop", daemon=True)
+    thread.start()
+    return loop
+
+
+def run_async(coro, timeout=None):
+    """Run `coro` on the shared background loop and block until its result is ready."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    return future.result(timeout)
+
+
+def iterate_async(agen, timeout=None):
+    """
+    Drive the async generator `agen` on the shared background loop and yield its
+    items synchronously, so the Streamlit script thread can render each one
+    (e.g. through st.write_stream) as soon as it is produced.
+    """
+    loop = get_event_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result(timeout)
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result(timeout)
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client():
+    """One AsyncOpenAI client per process, shared by all sessions."""
+    import openai
+    from openai import AsyncOpenAI
+
+    openai_api_key, _ = get_api_keys()
+    openai.api_key = openai_api_key
+    print("✅ OpenAI client initialized!")
+    return AsyncOpenAI(api_key=openai_api_key)
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_cache():
+    """One query-embedding cache per process (see embedding_cache.py)."""
+    from embedding_cache import EmbeddingCache
+
+    return EmbeddingCache(max_entries=EMBEDDING_CACHE_SIZE, db_path=EMBEDDING_CACHE_DB)
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_dispatcher():
+    """One micro-batching embeddings dispatcher per process (see embedding_dispatcher.py)."""
+    from embedding_dispatcher import EmbeddingDispatcher
+
+    return EmbeddingDispatcher(
+        get_openai_client(),
+        model=get_embedding_cache().model,
+        max_batch_size=EMBEDDING_MAX_BATCH,
+        max_wait_ms=EMBEDDING_MAX_WAIT_MS
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache():
+    """One semantic response cache per process (see response_cache.py)."""
+    from response_cache import SemanticResponseCache
+
+    return SemanticResponseCache(
+        threshold=RESPONSE_CACHE_THRESHOLD,
+        ttl_seconds=RESPONSE_CACHE_TTL,
+        max_entries=RESPONSE_CACHE_SIZE
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_pinecone_index():
+    """One Pinecone index handle per process, shared by all sessions."""
+    from pinecone import Pinecone
+
+    _, pinecone_api_key = get_api_keys()
+    pc = Pinecone(api_key=pinecone_api_key)
+    print("✅ Pinecone client initialized!")
+    return pc.Index(PINECONE_INDEX_NAME)
+
+
+@st.cache_resource(show_spinner=False)
+def get_vector_store():
+    """The retrieval backend selected by UNIEASE_VECTOR_STORE (see vector_store.py)."""
+    from vector_store import LocalVectorStore, PineconeVectorStore
+
+    if VECTOR_STORE_BACKEND == "local":
+        store = LocalVectorStore.load(LOCAL_VECTOR_STORE_PATH)
+        if store.ann is not None and ANN_N_PROBE:
+            store.ann.n_probe = int(ANN_N_PROBE)
+        print(f"✅ Local vector store loaded ({store.count()} vectors)")
+        return store
+    if VECTOR_STORE_BACKEND != "pinecone":
+        raise ValueError(f"❌ Unknown UNIEASE_VECTOR_STORE: {VECTOR_STORE_BACKEND}")
+    return PineconeVectorStore(get_pinecone_index())
+
+
+@st.cache_resource(show_spinner=False)
+def get_bm25_index():
+    """The BM25 keyword index over the knowledge base, built once per process (see bm25_index.py)."""
+    from bm25_index import BM25Index
+
+    index = BM25Index.from_knowledge_base(KNOWLEDGE_BASE_PATH)
+    print(f"✅ BM25 index built ({index.count()} QA pairs)")
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def get_direct_answer_matcher():
+    """The direct-answer matcher over the knowledge base's questions, built once per process (see direct_answer.py)."""
+    import json
+    from direct_answer import DirectAnswerMatcher
+
+    with open(KNOWLEDGE_BASE_PATH, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f).get("qa_pairs", [])
+    return DirectAnswerMatcher(qa_pairs, threshold=DIRECT_ANSWER_THRESHOLD)
+
+
+@st.cache_resource(show_spinner=False)
+def get_intent_router():
+    """The generic intent router, compiled once per process from intents.json (or UNIEASE_INTENTS)."""
+    from intent_router import IntentRouter
+
+    return IntentRouter.from_file(INTENTS_PATH) if INTENTS_PATH else IntentRouter.from_file()
+
+
+@st.cache_resource(show_spinner=False)
+def get_emergency_response():
+    """
+    The reply for messages containing crisis language, rendered once per process
+    from the knowledge base's is_emergency entries (see crisis_detector.py).
+    Falls back to the fixed helpline header if the knowledge base can't be read.
+    """
+    import json
+    from crisis_detector import CRISIS_HEADER, render_emergency_response, select_emergency_resources
+
+    try:
+        with open(KNOWLEDGE_BASE_PATH, "r", encoding="utf-8") as f:
+            qa_pairs = json.load(f).get("qa_pairs", [])
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not load emergency resources from {KNOWLEDGE_BASE_PATH}: {e}")
+        return CRISIS_HEADER
+    return render_emergency_response(select_emergency_resources(qa_pairs))
+
+
+@st.cache_resource(show_spinner="Loading sentiment model...")
+def get_sentiment_analyzer():
+    """Load the DistilBERT sentiment model once per process, on UNIEASE_SENTIMENT_BACKEND."""
+    from sentiment import build_sentiment_analyzer
+
+    analyzer = build_sentiment_analyzer(
+        SENTIMENT_MODEL,
+        revision=SENTIMENT_REVISION,
+        backend=SENTIMENT_BACKEND,
+        threads=SENTIMENT_THREADS
+    )
+    print(f"✅ Sentiment model loaded ({SENTIMENT_BACKEND})!")
+    return analyzer
+
+
+@st.cache_resource(show_spinner=False)
+def get_sentiment_batcher():
+    """
+    One sentiment queue per process: concurrent requests from every session are
+    classified together in padded batches (see micro_batcher.py).
+    """
+    from micro_batcher import MicroBatcher
+    from sentiment import classify_batch
+
+    return MicroBatcher(
+        lambda texts: classify_batch(get_sentiment_analyzer(), texts),
+        max_batch_size=SENTIMENT_MAX_BATCH,
+        max_wait_ms=SENTIMENT_MAX_WAIT_MS,
+        name="sentiment"
+    )
+
+
+@st.cache_resource(show_spinner="Warming up...")
+def warm_up():
+    """
+    Build every shared resource and exercise it once so the first student
+    message doesn't pay for model loading or connection setup:
+      - one dummy sentiment inference (unless UNIEASE_SENTIMENT_MODE=off)
+      - the crisis fast-path reply, rendered from the knowledge base
+      - the BM25 keyword index (unless UNIEASE_RETRIEVAL=vector)
+      - the direct-answer matcher over the knowledge base's questions
+      - one vector store handshake (describe_index_stats for Pinecone)
+      - one OpenAI handshake on the shared event loop, which opens the
+        keep-alive connection later messages reuse
+    Runs once per process; later calls return immediately.
+    """
+    if SENTIMENT_MODE != "off":
+        try:
+            get_sentiment_analyzer()("warm up")
+        except Exception as e:
+            print(f"⚠️ Sentiment warm-up failed: {e}")
+
+    get_emergency_response()
+
+    if RETRIEVAL_MODE != "vector":
+        try:
+            get_bm25_index()
+        except Exception as e:
+            print(f"⚠️ BM25 warm-up failed: {e}")
+
+    try:
+        get_direct_answer_matcher()
+    except Exception as e:
+        print(f"⚠️ Direct-answer warm-up failed: {e}")
+
+    try:
+        get_vector_store().count()
+    except Exception as e:
+        print(f"⚠️ Vector store warm-up failed: {e}")
+
+    try:
+        run_async(get_openai_client().models.list(), timeout=30)
+    except Exception as e:
+        print(f"⚠️ OpenAI warm-up failed: {e}")
+
+    print("✅ Warm-up complete!")
+    return True
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Semantic response cache.
+#
+# Many student questions are paraphrases of the same few hundred knowledge base
+# questions. SemanticResponseCache sits in front of the chat.completions call: it
+# keeps earlier answers keyed by the query embedding and returns one when a new
+# query is close enough (cosine similarity >= threshold), skipping the LLM.
+#
+# Answers depend on what is in the index, so every entry is dropped when the
+# knowledge base is re-indexed. Both writers of the index, re-indexing.py and
+# "OpenAI Embedding Code-checkpoint.py", call mark_index_updated(), which touches
+# INDEX_VERSION_PATH; the cache notices the new mtime on its next lookup.
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+INDEX_VERSION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index_version.json")
+
+
+def mark_index_updated(path=INDEX_VERSION_PATH, **details):
+    """Record that the vector index changed, invalidating every SemanticResponseCache."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"updated_at": time.time(), **details}, f, indent=2)
+
+
+def _index_version(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SemanticResponseCache:
+    """
+    Cache of generated answers looked up by query-embedding similarity.
+
+    - threshold: minimum cosine similarity for a hit
+    - ttl_seconds: entries older than this are never returned
+    - max_entries: oldest entries are evicted beyond this size
+    - version_path: file whose mtime marks the current index version
+    """
+
+    def __init__(self, threshold=0.95, ttl_seconds=24 * 3600, max_entries=1000,
+                 version_path=INDEX_VERSION_PATH):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_path = version_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._version = _index_version(version_path)
+        self._reset()
+
+    def _reset(self):
+        self._vectors = np.empty((0, 0), dtype=np.float32)  # unit-normalized rows
+        self._answers = []
+        self._questions = []
+        self._created = []
+
+    def _check_version(self):
+        version = _index_version(self.version_path)
+        if version != self._version:
+            self._version = version
+            self._reset()
+
+    def _expire(self, now):
+        # Entries are appended in time order, so expired ones are always a prefix
+        keep_from = 0
+        while keep_from < len(self._created) and now - self._created[keep_from] > self.ttl_seconds:
+            keep_from += 1
+        if keep_from:
+            self._drop_oldest(keep_from)
+
+    def _drop_oldest(self, count):
+        self._vectors = self._vectors[count:]
+        del self._answers[:count]
+        del self._questions[:count]
+        del self._created[:count]
+
+    def lookup(self, query_embedding):
+        """Return the cached answer closest to `query_embedding`, or None."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        with self._lock:
+            self._check_version()
+            self._expire(time.time())
+            if not self._answers or norm == 0:
+                self.misses += 1
+                return None
+
+            scores = self._vectors @ (query / norm)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                self.hits += 1
+                return self._answers[best]
+
+            self.misses += 1
+            return None
+
+    def store(self, query_embedding, answer, question=None):
+        """Remember `answer` for `query_embedding`."""
+        vector = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0 or not answer:
+            return
+        vector = (vector / norm).reshape(1, -1)
+
+        with self._lock:
+            self._check_version()
+            if self._answers and self._vectors.shape[1] != vector.shape[1]:
+                self._reset()  # embedding model changed
+            self._vectors = vector if not self._answers else np.vstack([self._vectors, vector])
+            self._answers.append(answer)
+            self._questions.append(question)
+            self._created.append(time.time())
+            if len(self._answers) > self.max_entries:
+                self._drop_oldest(len(self._answers) - self.max_entries)
+
+    def invalidate(self):
+        """Drop every cached answer in this process."""
+        with self._lock:
+            self._reset()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._answers),
+                "threshold": self.threshold,
+            }
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Async scraper for the wlv.ac.uk support pages (from "Scraping code.ipynb").
+#
+# The notebook fetched each URL in turn through requests.Session, then re-parsed
+# the whole page with BeautifulSoup on every run. scrape_urls() instead:
+#   - fetches up to `concurrency` pages at once with aiohttp, but never more than
+#     `per_host` at a time from one host, spaced at least `host_delay` seconds apart
+#   - remembers each page's ETag / Last-Modified along with the pairs extracted from
+#     it, and sends If-None-Match / If-Modified-Since next time, so an unchanged
+#     page costs one 304 and no parsing
+#   - feeds the body into a streaming html.parser extractor as it downloads,
+#     pairing each <h2> with the text of the <p> elements that follow it
+#
+# Usage:
+#   python scraper.py                          # the URLs below -> scraped_data.json
+#   python scraper.py URL [URL ...] --output out.json --concurrency 4
+#   python scraper.py --refresh                # ignore the cache, download everything
+
+import argparse
+import asyncio
+import codecs
+import json
+import os
+import time
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# List of URLs to scrape
+URLS = [
+    "https://www.wlv.ac.uk/university-life/student-life/",
+    "https://www.wlv.ac.uk/current-students/student-support/student-support-and-wellbeing-ssw/advice-for-students-with-disabilities-and-specific-learning-disabilities/i-am-a-current-student/",
+    "https://www.wlv.ac.uk/current-students/student-support/mental-health-and-wellbeing-advice/",
+    "https://www.wlv.ac.uk/current-students/student-support/support-to-study-/",
+    "https://www.wlv.ac.uk/current-students/student-support/mental-health-and-wellbeing-advice/i-need-help-now/",
+]
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+OUTPUT_PATH = "scraped_data.json"
+CACHE_PATH = "scrape_cache.json"
+IRRELEVANT_KEYWORDS = ["Read More", "WLV News", "Click here", "Read more"]
+
+
+class HeadingParagraphExtractor(HTMLParser):
+    """
+    Incremental h2/p extractor: feed() it HTML as it arrives and read `qa_pairs`
+    after close(). Each <h2> becomes a question, and the text of every <p> up to
+    the next <h2> is joined into its answer.
+
+    Like a browser, it treats a left-out </p> as implied: a <p>, heading or other
+    block start tag, or the end tag of an enclosing element, closes an open <p>.
+    """
+
+    # Start tags that close an open <p> (the HTML implied end tag rule)
+    CLOSES_P = frozenset(
+        "address article aside blockquote details div dl fieldset figcaption figure footer form "
+        "h1 h2 h3 h4 h5 h6 header hgroup hr main menu nav ol p pre section table ul".split()
+    )
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.qa_pairs = []
+        self._heading = None
+        self._paragraphs = []
+        self._tag = None      # "h2" or "p" while inside one
+        self._inner = []      # tags opened inside it and not closed yet
+        self._text = []
+
+    def _finish_pair(self):
+        if self._heading and self._paragraphs:
+            self.qa_pairs.append({
+                "question": self._heading,
+                "answer": " ".join(self._paragraphs).strip()
+            })
+
+    def _close_element(self):
+        text = "".join(self._text).strip()
+        if self._tag == "h2":
+            self._finish_pair()
+            self._heading, self._paragraphs = text, []
+        elif self._heading:
+            self._paragraphs.append(text)
+        self._tag, self._inner, self._text = None, [], []
+
+    def handle_starttag(self, tag, attrs):
+        if self._tag == "p" and tag in self.CLOSES_P:
+            self._close_element()
+        elif self._tag == "h2" and tag in ("h2", "p"):
+            # An unclosed heading ends where the next heading or paragraph starts
+            self._close_element()
+        if self._tag is None:
+            if tag in ("h2", "p"):
+                self._tag, self._inner, self._text = tag, [], []
+        else:
+            self._inner.append(tag)
+
+    def handle_endtag(self, tag):
+        if self._tag is None:
+            return
+        if tag in self._inner:
+            del self._inner[len(self._inner) - 1 - self._inner[::-1].index(tag)]
+        elif tag == self._tag or self._tag == "p":
+            # Its own end tag, or the end of an element enclosing an open <p>
+            self._close_element()
+
+    def handle_data(self, data):
+        if self._tag is not None:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        if self._tag is not None:
+            self._close_element()
+        self._finish_pair()
+        self._heading, self._paragraphs = None, []
+
+
+def extract_qa_pairs(html):
+    """h2/p pairs from a complete HTML string."""
+    parser = HeadingParagraphExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.qa_pairs
+
+
+class HostPoliteness:
+    """Per-host concurrency limit plus a minimum gap between request starts."""
+
+    def __init__(self, per_host=2, host_delay=0.5):
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    def semaphore(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+            self._locks[host] = asyncio.Lock()
+        return self._semaphores[host]
+
+    async def wait_turn(self, host):
+        async with self._locks[host]:
+            wait = self._last_start.get(host, 0) + self.host_delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start[host] = time.monotonic()
+
+
+def load_cache(cache_path):
+    if not cache_path or not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable cache {cache_path}: {e}")
+        return {}
+
+
+def save_cache(cache_path, cache):
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+async def scrape_url(url, session, cache, politeness, global_limit, timeout=30):
+    """
+    Fetch and parse one URL, using and updating `cache` (url -> {etag, last_modified, qa_pairs}).
+    Returns the page's QA pairs; on failure, the cached pairs if there are any.
+    """
+    cached = cache.get(url)
+    headers = dict(HEADERS)
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    host = urlsplit(url).netloc
+    started = time.perf_counter()
+    async with global_limit, politeness.semaphore(host):
+        await politeness.wait_turn(host)
+        try:
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status == 304 and cached:
+                    print(f"♻️ Not modified: {url} ({time.perf_counter() - started:.2f}s)")
+                    return cached["qa_pairs"]
+                if response.status != 200:
+                    print(f"Failed to retrieve {url}. Status code: {response.status}")
+                    return cached["qa_pairs"] if cached else []
+
+                # Parse while downloading
+                parser = HeadingParagraphExtractor()
+                decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+                async for block in response.content.iter_chunked(64 * 1024):
+                    parser.feed(decoder.decode(block))
+                parser.feed(decoder.decode(b"", final=True))
+                parser.close()
+
+                cache[url] = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "qa_pairs": parser.qa_pairs
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ Error fetching {url}: {e!r}")
+            return cached["qa_pairs"] if cached else []
+
+    print(f"✅ Scraped {url}: {len(parser.qa_pairs)} pairs ({time.perf_counter() - started:.2f}s)")
+    return parser.qa_pairs
+
+
+async def scrape_urls(urls, cache_path=CACHE_PATH, concurrency=8, per_host=2, host_delay=0.5, refresh=False):
+    """Scrape `urls` concurrently; returns their QA pairs in URL order."""
+    cache = {} if refresh else load_cache(cache_path)
+    politeness = HostPoliteness(per_host, host_delay)
+    global_limit = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(
+            scrape_url(url, session, cache, politeness, global_limit) for url in urls
+        ))
+
+    if cache_path:
+        save_cache(cache_path, cache)
+    return [pair for pairs in results for pair in pairs]
+
+
+def filter_and_deduplicate(pairs, irrelevant_keywords=IRRELEVANT_KEYWORDS):
+    """Drop short/empty/irrelevant answers and duplicate (question, answer) pairs."""
+    unique_pairs = []
+    seen = set()
+    for pair in pairs:
+        if (pair['answer'] and  # Ensure the answer is not empty
+                len(pair['answer'].split()) > 5 and  # Ensure the answer has at least 5 words
+                not any(keyword in pair['answer'] for keyword in irrelevant_keywords)):  # Exclude irrelevant pairs
+            pair_key = (pair['question'], pair['answer'])
+            if pair_key not in seen:
+                unique_pairs.append(pair)
+                seen.add(pair_key)
+    return unique_pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape h2/p Q&A pairs from web pages.")
+    parser.add_argument("urls", nargs="*", default=URLS)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--host-delay", type=float, default=0.5, help="seconds between requests to one host")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached ETags and re-download every page")
+    args = parser.parse_args(argv)
+
+    # Load existing scraped data (if any)
+    try:
+        with open(args.output, "r", encoding="utf-8") as file:
+            all_scraped_data = json.load(file)
+    except FileNotFoundError:
+        all_scraped_data = []
+
+    started = time.perf_counter()
+    all_scraped_data.extend(asyncio.run(scrape_urls(
+        args.urls, cache_path=args.cache, concurrency=args.concurrency,
+        per_host=args.per_host, host_delay=args.host_delay, refresh=args.refresh
+    )))
+    unique_pairs = filter_and_deduplicate(all_scraped_data)
+
+    # Save unique pairs to a JSON file
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(unique_pairs, file, indent=4)
+
+    print(f"Scraped data saved to {args.output} ({len(unique_pairs)} pairs, {time.perf_counter() - started:.2f}s).")
+
+
+if __name__ == "__main__":
+    main()
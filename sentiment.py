@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Sentiment analyzers for the chatbot, with three CPU backends:
+#   "pytorch"    the full-precision transformers pipeline (what the app always used)
+#   "quantized"  the same model with its Linear layers dynamically quantized to int8
+#                (torch.quantization.quantize_dynamic): no export step, and int8
+#                matmuls with a quarter of the Linear weight memory
+#   "onnx"       the model exported once to an ONNX graph and run with onnxruntime
+#                (pip install onnxruntime); the export is cached on disk
+# Every backend returns the pipeline's format, [{"label": ..., "score": ...}] per
+# text, so callers can switch between them freely. `threads` caps the intra-op
+# threads the backend uses (torch.set_num_threads / onnxruntime SessionOptions).
+#
+# classify_batch() runs a list of texts through any of them as padded batches,
+# which is what the app's cross-session micro-batcher calls.
+#
+# bench_sentiment.py compares the backends' latency and label agreement.
+
+import inspect
+import os
+
+BACKENDS = ("pytorch", "quantized", "onnx")
+ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniease", "onnx")
+# DistilBERT's position limit; longer messages are truncated rather than rejected
+MAX_LENGTH = 512
+
+
+def build_sentiment_analyzer(model, revision=None, backend="pytorch", threads=None, onnx_cache_dir=ONNX_CACHE_DIR):
+    """A callable mapping a text (or list of texts) to [{"label", "score"}, ...]."""
+    if backend not in BACKENDS:
+        raise ValueError(f"❌ Unknown sentiment backend {backend!r}; use one of {BACKENDS}")
+    if backend == "onnx":
+        return OnnxSentimentAnalyzer(model, revision, threads=threads, cache_dir=onnx_cache_dir)
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    if threads:
+        torch.set_num_threads(threads)
+    if backend == "pytorch":
+        return pipeline("sentiment-analysis", model=model, revision=revision)
+
+    tokenizer = AutoTokenizer.from_pretrained(model, revision=revision)
+    fp32_model = AutoModelForSequenceClassification.from_pretrained(model, revision=revision).eval()
+    int8_model = torch.quantization.quantize_dynamic(fp32_model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("sentiment-analysis", model=int8_model, tokenizer=tokenizer)
+
+
+def classify_batch(analyzer, texts):
+    """
+    Lowercase labels for `texts`, classified in one padded forward pass. The texts
+    come from different sessions, so if the batch fails each text is retried on its
+    own and one that still fails gets None instead of failing everyone's request.
+    """
+    texts = list(texts)
+    try:
+        results = analyzer(texts, batch_size=len(texts), truncation=True, max_length=MAX_LENGTH)
+        return [result["label"].lower() for result in results]
+    except Exception as e:
+        if len(texts) == 1:
+            print(f"⚠️ Sentiment failed for a {len(texts[0])}-char message: {e}")
+            return [None]
+    return [classify_batch(analyzer, [text])[0] for text in texts]
+
+
+class OnnxSentimentAnalyzer:
+    """A sequence-classification model exported to ONNX and run with onnxruntime."""
+
+    def __init__(self, model, revision=None, threads=None, cache_dir=ONNX_CACHE_DIR, max_length=MAX_LENGTH):
+        import onnxruntime
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model, revision=revision)
+        self.id2label = AutoConfig.from_pretrained(model, revision=revision).id2label
+        self.max_length = max_length
+
+        onnx_path = os.path.join(cache_dir, f"{model.replace('/', '--')}-{revision or 'main'}.onnx")
+        if not os.path.isfile(onnx_path):
+            export_onnx(model, revision, onnx_path)
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def __call__(self, texts, batch_size=None, truncation=True, max_length=None):
+        """
+        Classify `texts` as one padded batch. batch_size and truncation are accepted for
+        pipeline compatibility; texts are always truncated to max_length (default: the
+        analyzer's max_length).
+        """
+        import numpy as np
+
+        if isinstance(texts, str):
+            texts = [texts]
+        encoded = self.tokenizer(
+            list(texts), padding=True, truncation=True, max_length=max_length or self.max_length, return_tensors="np"
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        return [
+            {"label": self.id2label[int(row.argmax())], "score": float(row.max())}
+            for row in probabilities
+        ]
+
+
+def export_onnx(model, revision, onnx_path):
+    """Export `model` to `onnx_path` with dynamic batch and sequence axes (written atomically)."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model, revision=revision)
+    torch_model = AutoModelForSequenceClassification.from_pretrained(model, revision=revision).eval()
+    sample = tokenizer(["warm up"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask") if name in sample]
+
+    # Newer torch defaults to the dynamo exporter (needs onnxscript); keep the TorchScript one
+    legacy_exporter = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+    os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+    tmp_path = onnx_path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            torch_model,
+            tuple(sample[name] for name in input_names),
+            tmp_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names}, "logits": {0: "batch"}},
+            opset_version=14,
+            **legacy_exporter
+        )
+    os.replace(tmp_path, onnx_path)
+    print(f"✅ Exported {model} to {onnx_path}")
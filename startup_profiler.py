@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Cold-start profiler for app.py.
+#
+# Usage:
+#   python startup_profiler.py               # human readable table
+#   python startup_profiler.py --json        # one JSON object, for release tracking
+#   python app.py --profile-startup [--json]
+#
+# For every heavy dependency it reports:
+#   - import time, measured in a fresh interpreter so earlier imports don't hide the cost
+#   - first-response time, i.e. building the shared resource and making its first call
+#     (needs the API keys in .streamlit/secrets.toml; failures are reported, not raised)
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+# Module imported by each dependency of app.py, in the order the app needs them
+DEPENDENCIES = {
+    "streamlit": "streamlit",
+    "openai": "openai",
+    "pinecone": "pinecone",
+    "transformers": "transformers",
+    "torch": "torch",
+}
+
+IMPORT_TIMER = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import_time(module):
+    """Import `module` in a new interpreter and return the seconds spent, or an error string."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_TIMER.format(module=module)],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return None, last_line
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def _first_sentiment():
+    from resources import get_sentiment_analyzer
+    get_sentiment_analyzer()("warm up")
+
+
+def _first_embedding():
+    from resources import get_openai_client
+
+    async def embed():
+        await get_openai_client().embeddings.create(
+            model="text-embedding-ada-002",
+            input=["warm up"]
+        )
+
+    asyncio.run(embed())
+
+
+def _first_vector_store_call():
+    from resources import get_vector_store
+    get_vector_store().count()
+
+
+# Dependency -> callable that builds its resource and makes the first real call
+FIRST_RESPONSES = {
+    "transformers": _first_sentiment,
+    "openai": _first_embedding,
+    "pinecone": _first_vector_store_call,
+}
+
+
+def measure_first_response(fn):
+    """Time one call of `fn`, returning (seconds, None) or (None, error message)."""
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        return None, str(e)
+    return time.perf_counter() - start, None
+
+
+def profile_startup(first_response=True):
+    """Collect import and first-response timings for every dependency of app.py."""
+    report = {"python": sys.version.split()[0], "dependencies": {}}
+
+    for name, module in DEPENDENCIES.items():
+        seconds, error = measure_import_time(module)
+        report["dependencies"][name] = {"import_s": seconds, "import_error": error}
+
+    if first_response:
+        for name, fn in FIRST_RESPONSES.items():
+            seconds, error = measure_first_response(fn)
+            entry = report["dependencies"][name]
+            entry["first_response_s"] = seconds
+            entry["first_response_error"] = error
+
+    return report
+
+
+def print_report(report):
+    print(f"🔵 Startup profile (Python {report['python']})")
+    print(f"   {'dependency':<14}{'import (s)':>12}{'first response (s)':>21}")
+    for name, entry in report["dependencies"].items():
+        import_s = f"{entry['import_s']:.3f}" if entry["import_s"] is not None else "error"
+        if "first_response_s" not in entry:
+            first_s = "-"
+        elif entry["first_response_s"] is not None:
+            first_s = f"{entry['first_response_s']:.3f}"
+        else:
+            first_s = "error"
+        print(f"   {name:<14}{import_s:>12}{first_s:>21}")
+
+    for name, entry in report["dependencies"].items():
+        for key in ("import_error", "first_response_error"):
+            if entry.get(key):
+                print(f"⚠️ {name} {key.replace('_', ' ')}: {entry[key]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-start cost of app.py dependencies.")
+    parser.add_argument("--profile-startup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--imports-only", action="store_true",
+                        help="skip first-response timings (no API keys or network needed)")
+    args = parser.parse_args(argv)
+
+    report = profile_startup(first_response=not args.imports_only)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
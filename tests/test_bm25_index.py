@@ -0,0 +1,71 @@
+from bm25_index import BM25Index, document_id, fuse_matches, reciprocal_rank_fusion
+from vector_store import LocalVectorStore, Match
+
+QA_PAIRS = [
+    {"id": "dsa_001", "question": "How do I apply for DSA?",
+     "answer": {"main_points": ["Apply through Student Finance with evidence of your condition."]}},
+    {"id": "pal_002", "question": "What is PAL?",
+     "answer": {"main_points": ["Peer Assisted Learning pairs you with students in later years."]}},
+    {"id": "ec_003", "question": "How do I submit an EC form?",
+     "answer": {"main_points": ["Submit extenuating circumstances before the deadline."]}},
+    {"id": "sleep_004", "question": "How can I sleep better before exams?",
+     "answer": {"main_points": ["Keep a regular bedtime and avoid screens late at night."]}},
+]
+
+
+def chunked_vector_store():
+    """A store laid out like the embedding script's: "<qa id>_chunkN" ids with a doc_id in the metadata."""
+    store = LocalVectorStore()
+    vectors = {
+        "dsa_001_chunk0": [1.0, 0.0, 0.0],
+        "dsa_001_chunk1": [0.9, 0.1, 0.0],
+        "pal_002_chunk0": [0.5, 0.5, 0.0],
+        "ec_003_chunk0": [0.0, 0.0, 1.0],
+    }
+    store.upsert([
+        {"id": vector_id, "values": values,
+         "metadata": {"doc_id": vector_id.rsplit("_chunk", 1)[0], "answer": f"answer for {vector_id}"}}
+        for vector_id, values in vectors.items()
+    ])
+    return store
+
+
+def test_query_ranks_keyword_matches_and_skips_unrelated_documents():
+    index = BM25Index.from_qa_pairs(QA_PAIRS)
+
+    matches = index.query("apply for DSA", top_k=3)
+
+    assert [match.id for match in matches] == ["dsa_001"]
+    assert matches[0].metadata == {
+        "doc_id": "dsa_001",
+        "question": "How do I apply for DSA?",
+        "answer": "Apply through Student Finance with evidence of your condition.",
+    }
+    assert index.query("the and of", top_k=3) == []
+
+
+def test_document_id_strips_chunk_suffix_without_metadata():
+    assert document_id(Match("dsa_001_chunk3", 0.5, {})) == "dsa_001"
+    assert document_id(Match("dsa_001_chunk3", 0.5, {"doc_id": "other"})) == "other"
+    assert document_id(Match("qa_7", 0.5, None)) == "qa_7"
+
+
+def test_same_qa_from_vector_store_and_bm25_fills_one_fused_slot():
+    vector_matches = chunked_vector_store().query([1.0, 0.05, 0.0], top_k=4)
+    keyword_matches = BM25Index.from_qa_pairs(QA_PAIRS).query("apply for DSA", top_k=4)
+    assert [match.id for match in vector_matches][:2] == ["dsa_001_chunk0", "dsa_001_chunk1"]
+
+    fused = fuse_matches([vector_matches, keyword_matches], top_k=3)
+
+    assert [match.id for match in fused] == ["dsa_001", "pal_002", "ec_003"]
+    # Found by both retrievers, so it outranks anything found by one
+    assert fused[0].score == 2 / 61
+    # The first list's metadata wins
+    assert fused[0].metadata["answer"] == "answer for dsa_001_chunk0"
+
+
+def test_reciprocal_rank_fusion_sums_reciprocal_ranks():
+    fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60)
+
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+    assert fused[0][1] == 1 / 62 + 1 / 61
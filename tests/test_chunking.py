@@ -0,0 +1,93 @@
+import re
+
+import pytest
+
+from chunking import chunk_text
+
+
+class WordEncoding:
+    """
+    A stand-in for a tiktoken Encoding (whose BPE files are downloaded on first use).
+    Like tiktoken, a word's leading space belongs to that word's token: "rest. The" is
+    " rest", ".", " The".
+    """
+
+    PATTERN = re.compile(r" ?\w+| ?[^\w\s]+|\s+")
+
+    def __init__(self):
+        self.vocab = {}
+        self.pieces = []
+
+    def encode(self, text):
+        tokens = []
+        for piece in self.PATTERN.findall(text):
+            if piece not in self.vocab:
+                self.vocab[piece] = len(self.pieces)
+                self.pieces.append(piece)
+            tokens.append(self.vocab[piece])
+        return tokens
+
+    def decode_with_offsets(self, tokens):
+        text, offsets = "", []
+        for token in tokens:
+            offsets.append(len(text))
+            text += self.pieces[token]
+        return text, offsets
+
+
+SENTENCES = [f"Sentence {i} says alpha beta gamma and then it should rest." for i in range(40)]
+TEXT = " ".join(SENTENCES)
+
+
+def chunk_spans(text, chunks):
+    """(start, end) character offsets of each chunk in `text`."""
+    spans, search_from = [], 0
+    for chunk, _ in chunks:
+        start = text.index(chunk, search_from)
+        spans.append((start, start + len(chunk)))
+        search_from = start + 1
+    return spans
+
+
+def test_chunks_end_on_sentence_boundaries():
+    chunks = chunk_text(TEXT, WordEncoding(), max_tokens=40)
+
+    assert len(chunks) > 1
+    for chunk, token_count in chunks:
+        assert token_count <= 40
+        assert chunk.startswith("Sentence ")
+        assert chunk.endswith("should rest.")
+    assert " ".join(chunk for chunk, _ in chunks) == TEXT
+
+
+def test_overlap_repeats_the_last_tokens_of_the_previous_chunk():
+    encoding = WordEncoding()
+    chunks = chunk_text(TEXT, encoding, max_tokens=40, overlap=6)
+    spans = chunk_spans(TEXT, chunks)
+
+    assert len(chunks) > 1
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert start < previous_end
+        assert len(encoding.encode(TEXT[start:previous_end])) == 6
+    assert spans[0][0] == 0 and spans[-1][1] == len(TEXT)
+
+
+def test_paragraph_break_is_preferred_over_sentence_end():
+    first = " ".join(SENTENCES[:3])
+    second = " ".join(SENTENCES[3:6])
+    chunks = chunk_text(f"{first}\n\n{second}", WordEncoding(), max_tokens=50)
+
+    assert [chunk for chunk, _ in chunks][0] == first
+
+
+def test_short_text_is_one_chunk():
+    encoding = WordEncoding()
+    assert chunk_text("One short sentence.", encoding, max_tokens=40) == [("One short sentence.", 4)]
+    assert chunk_text("   ", encoding) == []
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        chunk_text(TEXT, WordEncoding(), max_tokens=0)
+    with pytest.raises(ValueError):
+        chunk_text(TEXT, WordEncoding(), max_tokens=10, overlap=10)
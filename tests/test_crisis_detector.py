@@ -0,0 +1,74 @@
+import pytest
+
+from crisis_detector import KeywordMatcher, detect_crisis
+from merged_json import add_emergency_flag
+
+# Messages that must get the emergency resources straight away
+CRISIS_MESSAGES = [
+    "I need help now",
+    "I want to end it all",
+    "i just want to end it all tonight",
+    "I don't want to be alive anymore",
+    "i dont want to be alive",
+    "I do not want to live anymore",
+    "sometimes I think about killing myself",
+    "I've been self-harming again",
+    "I keep cutting myself",
+    "everyone would be better off without me",
+    "I feel suicidal",
+    "I took an overdose",
+    "I wish I was dead",
+    "there's nothing to live for",
+    "I don't want to wake up tomorrow",
+]
+
+# Ordinary questions that mention urgent or emergency matters, or come close to a crisis phrase
+NOT_CRISIS_MESSAGES = [
+    "How can I build an emergency fund as a student?",
+    "How do I prioritize tasks when everything feels urgent?",
+    "Can I get an emergency extension on my essay?",
+    "What do I do if my boiler breaks in an emergency?",
+    "this deadline is going to kill me",
+    "I don't want to live in halls next year",
+    "what happens at the end of it all, after graduation?",
+    "How do I end my tenancy early?",
+    "Where can I find the crisis management module reading list?",
+    "I am alive with excitement about freshers week",
+]
+
+
+@pytest.mark.parametrize("message", CRISIS_MESSAGES)
+def test_crisis_messages_are_detected(message):
+    assert detect_crisis(message)
+
+
+@pytest.mark.parametrize("message", NOT_CRISIS_MESSAGES)
+def test_ordinary_messages_are_not_crises(message):
+    assert detect_crisis(message) is None
+
+
+def test_matcher_matches_whole_words_only():
+    matcher = KeywordMatcher(["self harm", "crisis"])
+
+    assert matcher.find_all("Self-harm, and a crisis.") == ["self harm", "crisis"]
+    assert matcher.search("crisises") is None
+
+
+def qa(question, *main_points):
+    return {"question": question, "answer": {"main_points": list(main_points)}}
+
+
+def test_only_emergency_resources_are_flagged():
+    qa_pairs = [
+        qa("How can I build an emergency fund as a student?", "Save a little each month for emergencies."),
+        qa("How do I prioritize tasks when everything feels urgent?", "Sort urgent and important tasks."),
+        qa("What is this guide about?", "Managing university life during a family health crisis."),
+        qa("Who can I contact for help?", "**Samaritans** – **116 123**", "**NHS 111** – **Call 111**"),
+        qa("What should students do if they need immediate support?", "Visit the \"I need help now\" webpage."),
+        {"question": "What if I am in danger?", "answer": "Call 999 straight away."},
+    ]
+
+    add_emergency_flag(qa_pairs)
+
+    assert [bool(pair.get("is_emergency")) for pair in qa_pairs] == [False, False, False, True, True, True]
+    assert qa_pairs[-1]["answer"]["main_points"] == ["Call 999 straight away."]
@@ -0,0 +1,57 @@
+import random
+
+from dedup import choose_bands, deduplicate_qa_pairs, jaccard, qa_text, shingles
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def near_duplicate_pairs(count, length=220, changed_words=5, seed=7):
+    """`count` (original, edited copy) QA pairs whose shingle Jaccard similarity is about 0.86."""
+    rng = random.Random(seed)
+    pairs = []
+    for n in range(count):
+        words = rng.sample(VOCABULARY, length)
+        edited = list(words)
+        # Edits far enough apart that each one changes three separate shingles
+        for position in rng.sample(range(5, length - 5, 8), changed_words):
+            edited[position] = f"edit{n}_{position}"
+        pairs.append((
+            {"id": f"qa_{n}", "question": "Question", "answer": {"main_points": [" ".join(words)]}},
+            {"id": f"qa_{n}_copy", "question": "Question", "answer": {"main_points": [" ".join(edited)]}},
+        ))
+    return pairs
+
+
+def test_band_split_recalls_pairs_at_the_threshold():
+    bands, rows = choose_bands(128, 0.85)
+
+    assert (bands, rows) == (16, 8)
+    assert 1 - (1 - 0.85 ** rows) ** bands >= 0.99
+
+
+def test_pairs_just_above_the_threshold_are_always_collapsed():
+    pairs = near_duplicate_pairs(200)
+    for original, copy in pairs:
+        assert 0.855 <= jaccard(shingles(qa_text(original)), shingles(qa_text(copy))) <= 0.875
+
+    kept, report = deduplicate_qa_pairs([qa for pair in pairs for qa in pair], threshold=0.85)
+
+    assert [qa["id"] for qa in kept] == [original["id"] for original, _ in pairs]
+    assert {(entry["removed_id"], entry["kept_id"], entry["kind"]) for entry in report} == {
+        (copy["id"], original["id"], "near") for original, copy in pairs
+    }
+
+
+def test_exact_duplicates_ignore_case_and_punctuation():
+    qa_pairs = [
+        {"id": "a", "question": "How do I apply for DSA?", "answer": {"main_points": ["Apply online."]}},
+        {"id": "b", "question": "how do i apply for dsa", "answer": {"main_points": ["Apply online"]},
+         "is_emergency": True},
+        {"id": "c", "question": "What is PAL?", "answer": {"main_points": ["Peer Assisted Learning."]}},
+    ]
+
+    kept, report = deduplicate_qa_pairs(qa_pairs)
+
+    assert [qa["id"] for qa in kept] == ["a", "c"]
+    assert report[0]["kind"] == "exact" and report[0]["kept_id"] == "a"
+    assert kept[0]["is_emergency"] is True
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from embedding_cache import EmbeddingCache
+
+
+class FakeEmbeddingsClient:
+    """Async client shaped like AsyncOpenAI: embeddings.create returns one vector per call."""
+
+    def __init__(self):
+        self.calls = 0
+        self.embeddings = self
+
+    async def create(self, model, input):
+        self.calls += 1
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input])
+
+
+class ThreadRecordingCache(EmbeddingCache):
+    """Records which thread each SQLite read and write ran on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.db_threads = []
+
+    def _disk_get(self, key):
+        self.db_threads.append(threading.get_ident())
+        return super()._disk_get(key)
+
+    def _disk_put(self, key, vector):
+        self.db_threads.append(threading.get_ident())
+        super()._disk_put(key, vector)
+
+
+def test_sqlite_runs_off_the_event_loop_and_persists(tmp_path):
+    db_path = str(tmp_path / "embeddings.sqlite")
+    client = FakeEmbeddingsClient()
+    cache = ThreadRecordingCache(db_path=db_path)
+
+    async def embed_twice():
+        loop_thread = threading.get_ident()
+        first = await cache.get_or_embed("How do I manage stress?", client)
+        second = await cache.get_or_embed("how do i manage stress", client)
+        await asyncio.get_running_loop().run_in_executor(cache._db_executor, lambda: None)  # let the write finish
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(embed_twice())
+
+    assert first == second == [23.0, 1.0]
+    assert client.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # One disk read for the first miss and one write-through; none on the loop thread
+    assert len(cache.db_threads) == 2
+    assert loop_thread not in cache.db_threads
+
+    # A new process finds the vector on disk
+    reopened = EmbeddingCache(db_path=db_path)
+    assert asyncio.run(reopened.get_or_embed("How do I manage stress", client)) == [23.0, 1.0]
+    assert client.calls == 1
+
+
+def test_memory_hits_are_not_blocked_by_a_busy_database(tmp_path):
+    client = FakeEmbeddingsClient()
+    cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.sqlite"))
+    cache.put("exam stress", [1.0, 2.0])
+
+    async def main():
+        # Another process holding the database: the lookup of a new query waits on SQLite...
+        cache._db_lock.acquire()
+        blocked = asyncio.create_task(cache.get_or_embed("a brand new question", client))
+        await asyncio.sleep(0.05)
+
+        # ...while the loop keeps serving queries the LRU already holds
+        started = time.perf_counter()
+        vector = await cache.get_or_embed("Exam stress?", client)
+        elapsed = time.perf_counter() - started
+        assert not blocked.done()
+
+        cache._db_lock.release()
+        await blocked
+        return vector, elapsed
+
+    vector, elapsed = asyncio.run(main())
+
+    assert vector == [1.0, 2.0]
+    assert elapsed < 0.05
+
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0] and cache.get("c") == [3.0]
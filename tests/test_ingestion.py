@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from ingestion import is_retryable, retry_with_backoff
+
+
+class APIStatusError(Exception):
+    """Shaped like the OpenAI SDK's status errors: the HTTP status is on .status_code."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    """Named like the OpenAI SDK's connection error, which carries no status."""
+
+
+@pytest.mark.parametrize("error", [
+    APIStatusError(429),
+    APIStatusError(500),
+    APIStatusError(503),
+    APIConnectionError("connection reset"),
+    ConnectionResetError(),
+    TimeoutError(),
+    asyncio.TimeoutError(),
+])
+def test_transient_errors_are_retried(error):
+    assert is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    APIStatusError(400),
+    APIStatusError(401),
+    TypeError("unexpected keyword argument"),
+    KeyError("values"),
+    ValueError("❌ Vector for 'qa_1' has dimension 3, expected 1536"),
+])
+def test_other_errors_fail_at_once(error):
+    assert not is_retryable(error)
+
+
+def test_non_retryable_error_is_raised_after_one_attempt():
+    calls = []
+
+    async def make_call():
+        calls.append(1)
+        raise ValueError("dimension mismatch")
+
+    with pytest.raises(ValueError) as raised:
+        asyncio.run(retry_with_backoff(make_call, base_delay=0))
+    assert len(calls) == 1
+    assert raised.value.attempts == 1
+
+
+def test_transient_error_is_retried_until_it_succeeds():
+    calls = []
+
+    async def make_call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise APIStatusError(429)
+        return "ok"
+
+    assert asyncio.run(retry_with_backoff(make_call, base_delay=0)) == ("ok", 3)
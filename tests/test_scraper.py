@@ -0,0 +1,71 @@
+import asyncio
+import os
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from fake_site_server import ConditionalGetHandler
+from scraper import extract_qa_pairs, filter_and_deduplicate, load_cache, scrape_urls
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# What the notebook's BeautifulSoup find_all(["h2", "p"]) loop extracts from support_page.html
+EXPECTED_PAIRS = [
+    {"question": "Mental Health and Wellbeing Advice",
+     "answer": "Our team offers free and confidential support to all students. "
+               "You can book an appointment online or drop in during opening hours."},
+    {"question": "I need help now",
+     "answer": "If you are in immediate danger, call 999 or go to your nearest A&E. "
+               "You can also call Samaritans on 116 123, free, at any time."},
+    {"question": "Counselling",
+     "answer": "Short-term counselling is available to all registered students."},
+    {"question": "News", "answer": "Read more WLV News stories here."},
+]
+
+
+class QuietHandler(ConditionalGetHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_unclosed_paragraphs_end_at_the_next_heading():
+    html = "<h2>A</h2><p>one two three four five six<h2>B</h2><p>seven eight nine ten eleven twelve</p>"
+
+    assert extract_qa_pairs(html) == [
+        {"question": "A", "answer": "one two three four five six"},
+        {"question": "B", "answer": "seven eight nine ten eleven twelve"},
+    ]
+
+
+def test_extraction_matches_the_notebook():
+    with open(os.path.join(FIXTURES, "support_page.html"), encoding="utf-8") as f:
+        assert extract_qa_pairs(f.read()) == EXPECTED_PAIRS
+
+
+def test_scrape_then_revalidate_with_304(site, tmp_path):
+    url = f"{site}/support_page.html"
+    cache_path = str(tmp_path / "scrape_cache.json")
+
+    first = asyncio.run(scrape_urls([url], cache_path=cache_path, host_delay=0))
+    assert first == EXPECTED_PAIRS
+    assert load_cache(cache_path)[url]["etag"]
+
+    # The page is unchanged, so the second run gets a 304 and reuses the cached pairs
+    second = asyncio.run(scrape_urls([url], cache_path=cache_path, host_delay=0))
+    assert second == EXPECTED_PAIRS
+
+    assert [pair["question"] for pair in filter_and_deduplicate(first + second)] == [
+        "Mental Health and Wellbeing Advice", "I need help now", "Counselling",
+    ]
@@ -0,0 +1,29 @@
+from sentiment import MAX_LENGTH, classify_batch
+
+
+class FakeAnalyzer:
+    """Pipeline-shaped analyzer that fails any batch containing a message it can't handle."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None, truncation=False, max_length=None):
+        self.calls.append((list(texts), truncation, max_length))
+        if any("💥" in text for text in texts):
+            raise RuntimeError("The size of tensor a (900) must match the size of tensor b (512)")
+        return [{"label": "NEGATIVE" if "sad" in text else "POSITIVE", "score": 0.9} for text in texts]
+
+
+def test_batch_is_classified_in_one_truncated_call():
+    analyzer = FakeAnalyzer()
+
+    assert classify_batch(analyzer, ["I am sad", "great day"]) == ["negative", "positive"]
+    assert analyzer.calls == [(["I am sad", "great day"], True, MAX_LENGTH)]
+
+
+def test_one_failing_message_does_not_fail_the_rest_of_the_batch():
+    analyzer = FakeAnalyzer()
+
+    assert classify_batch(analyzer, ["I am sad", "💥", "great day"]) == ["negative", None, "positive"]
+    # The whole batch first, then each message on its own
+    assert len(analyzer.calls) == 4
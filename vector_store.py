@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Vector store interface used by retrieval and re-indexing.
+#
+#   - PineconeVectorStore wraps the existing pc.Index("ai-powered-chatbot") handle.
+#   - LocalVectorStore keeps every chunk vector in one contiguous float32 matrix and
+#     answers top-k with a single matmul + argpartition, in process. At our corpus
+#     size this is faster than the network hop to Pinecone and lets the bot run
+#     (and be tested) fully offline. For very large corpora it can sit on top of an
+#     IVF approximate index (see ann_index.py) via build_ann().
+#
+# Items use the same shape as Pinecone upserts: {"id": ..., "values": [...], "metadata": {...}}
+
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from ann_index import IVFIndex
+from embedding_artifact import open_embedding_artifact, write_embedding_artifact
+
+# One search result, mirroring the fields we read from Pinecone matches
+Match = namedtuple("Match", ["id", "score", "metadata"])
+
+
+class VectorStore:
+    """Minimal interface every retrieval backend implements."""
+
+    def query(self, vector, top_k=3):
+        """Return up to top_k Match tuples, best first."""
+        raise NotImplementedError
+
+    def upsert(self, items):
+        """Insert or replace items shaped like Pinecone upsert vectors."""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        """Remove vectors by id (unknown ids are ignored)."""
+        raise NotImplementedError
+
+    def count(self):
+        """Number of stored vectors."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every stored vector."""
+        raise NotImplementedError
+
+
+class PineconeVectorStore(VectorStore):
+    """The Pinecone index we have always used, behind the VectorStore interface."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def query(self, vector, top_k=3):
+        result = self.index.query(
+            vector=list(vector),
+            top_k=top_k,
+            include_metadata=True
+        )
+        return [Match(match.id, match.score, match.metadata or {}) for match in result.matches]
+
+    def upsert(self, items):
+        self.index.upsert(items)
+
+    def delete(self, ids):
+        if ids:
+            self.index.delete(ids=list(ids))
+
+    def count(self):
+        # Doubles as the connection handshake used by warm-up
+        return self.index.describe_index_stats().total_vector_count
+
+    def clear(self):
+        self.index.delete(delete_all=True)
+
+
+class FanOutVectorStore(VectorStore):
+    """Writes go to every store (e.g. Pinecone and a local artifact); reads use the first."""
+
+    def __init__(self, *stores):
+        self.stores = stores
+
+    def query(self, vector, top_k=3):
+        return self.stores[0].query(vector, top_k=top_k)
+
+    def upsert(self, items):
+        for store in self.stores:
+            store.upsert(items)
+
+    def delete(self, ids):
+        for store in self.stores:
+            store.delete(ids)
+
+    def count(self):
+        return self.stores[0].count()
+
+    def clear(self):
+        for store in self.stores:
+            store.clear()
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process brute-force cosine search.
+
+    Rows of self._vectors are unit-normalized, so a dot product is the cosine
+    similarity (the metric our Pinecone index uses). The matrix grows by doubling
+    so upserts stay amortized O(1) while the live rows remain one contiguous block.
+
+    With build_ann() queries go through an IVFIndex labelled by row number instead
+    of scanning every row; upserts and deletes keep it in sync.
+
+    save()/load() use the binary artifact format (see embedding_artifact.py); a
+    loaded store scores straight off the read-only memory map and only copies the
+    matrix into private memory on its first write.
+    """
+
+    # Rows cast to float32 at a time when scoring a float16 matrix
+    SCORE_BLOCK_ROWS = 65536
+
+    def __init__(self, dimension=None, dtype="float32"):
+        self.dimension = dimension
+        self.dtype = dtype  # dtype written by save()
+        self.ann = None
+        # Writers may run in worker threads (ingestion upserts via asyncio.to_thread)
+        self._write_lock = threading.Lock()
+        self._vectors = np.empty((0, dimension or 0), dtype=np.float32)
+        self._size = 0
+        self._ids = []
+        self._metadata = []
+        self._positions = {}  # id -> row
+
+    def _make_writable(self):
+        # A loaded store is backed by a shared read-only mmap; copy it on first write
+        if not self._vectors.flags.writeable or self._vectors.dtype != np.float32:
+            self._vectors = np.array(self._vectors[:self._size], dtype=np.float32)
+
+    def _ensure_capacity(self, needed):
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        grown = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+
+    def upsert(self, items):
+        with self._write_lock:
+            self._upsert(items)
+
+    def _upsert(self, items):
+        self._make_writable()
+        for item in items:
+            vector = np.asarray(item["values"], dtype=np.float32)
+            if self.dimension is None:
+                self.dimension = vector.shape[0]
+                self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+            if vector.shape[0] != self.dimension:
+                raise ValueError(f"❌ Vector for '{item['id']}' has dimension {vector.shape[0]}, expected {self.dimension}")
+
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector = vector / norm
+
+            row = self._positions.get(item["id"])
+            if row is None:
+                self._ensure_capacity(self._size + 1)
+                row = self._size
+                self._size += 1
+                self._ids.append(item["id"])
+                self._metadata.append(item.get("metadata", {}))
+                self._positions[item["id"]] = row
+            else:
+                self._metadata[row] = item.get("metadata", {})
+            self._vectors[row] = vector
+            if self.ann is not None:
+                self.ann.add(vector, row)
+
+    def delete(self, ids):
+        with self._write_lock:
+            self._delete(ids)
+
+    def _delete(self, ids):
+        self._make_writable()
+        for doc_id in ids:
+            row = self._positions.pop(doc_id, None)
+            if row is None:
+                continue
+            # Move the last row into the hole so live rows stay contiguous
+            last = self._size - 1
+            if self.ann is not None:
+                self.ann.remove(row)
+                self.ann.relabel(last, row)
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = self._ids[last]
+                self._metadata[row] = self._metadata[last]
+                self._positions[self._ids[row]] = row
+            self._ids.pop()
+            self._metadata.pop()
+            self._size -= 1
+
+    def count(self):
+        return self._size
+
+    def clear(self):
+        self.__init__(dimension=self.dimension, dtype=self.dtype)
+
+    def build_ann(self, n_lists=None, n_probe=8):
+        """Index the current rows with an IVF ANN index (see ann_index.py for the knobs)."""
+        self.ann = IVFIndex.build(
+            np.asarray(self._vectors[:self._size], dtype=np.float32), np.arange(self._size), n_lists=n_lists, n_probe=n_probe
+        )
+        return self.ann
+
+    def query(self, vector, top_k=3):
+        if self._size == 0 or top_k <= 0:
+            return []
+
+        if self.ann is not None:
+            rows, scores = self.ann.search(vector, top_k)
+            return [Match(self._ids[i], float(score), self._metadata[i]) for i, score in zip(rows, scores)]
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self._scores(query)
+        k = min(top_k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [Match(self._ids[i], float(scores[i]), self._metadata[i]) for i in top]
+
+    def _scores(self, query):
+        vectors = self._vectors[:self._size]
+        if vectors.dtype == np.float32:
+            return vectors @ query
+        # float16 has no BLAS path; cast in blocks so temporary memory stays bounded
+        return np.concatenate([
+            vectors[start:start + self.SCORE_BLOCK_ROWS].astype(np.float32) @ query
+            for start in range(0, self._size, self.SCORE_BLOCK_ROWS)
+        ])
+
+    def save(self, path, model=None):
+        """Write the store as a binary artifact at `path` (plus the ANN index, if any)."""
+        base, _ = os.path.splitext(path)
+        write_embedding_artifact(
+            path, self._vectors[:self._size], self._ids, self._metadata, dtype=self.dtype, model=model
+        )
+        if self.ann is not None:
+            self.ann.save(base + ".ivf.npz")
+        elif os.path.isfile(base + ".ivf.npz"):
+            os.remove(base + ".ivf.npz")  # don't let load() pick up a stale ANN index
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a store written by save(); with mmap=True the vectors stay memory-mapped."""
+        base, _ = os.path.splitext(path)
+        vectors, sidecar = open_embedding_artifact(path, mmap=mmap)
+
+        store = cls(dimension=vectors.shape[1], dtype=sidecar.get("dtype", "float32"))
+        store._vectors = vectors
+        store._size = vectors.shape[0]
+        store._ids = list(sidecar["ids"])
+        store._metadata = list(sidecar["metadata"])
+        store._positions = {doc_id: row for row, doc_id in enumerate(store._ids)}
+        if os.path.isfile(base + ".ivf.npz"):
+            store.ann = IVFIndex.load(base + ".ivf.npz")
+        return store